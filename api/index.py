@@ -6,21 +6,33 @@ Complete backend for AI-powered implementation configuration from CSV data
 # ═══════════════════════════════════════════════════════════════
 # 1. IMPORTS
 # ═══════════════════════════════════════════════════════════════
+import asyncio
 import base64
+import codecs
 import csv
+import hashlib
+import heapq
 import io
+import itertools
 import json
+import logging
 import os
 import pathlib as _pathlib
+import re
+import threading
 import time as _time_module
 from collections import Counter
 from datetime import datetime
+from html.parser import HTMLParser
+from operator import attrgetter
 from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
-import uuid
-from pydantic import BaseModel, Field
-from fastapi import FastAPI, HTTPException, UploadFile, File, Request
+import aiofiles
+import httpx
+from pydantic import BaseModel, Field, TypeAdapter
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # Try to import anthropic, fallback to mock if not available
@@ -30,16 +42,71 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+# Try to import orjson for faster JSON bodies, responses and stored blobs, fallback to stdlib json
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+    _json_loads = orjson.loads
+
+    def _json_dumps(value) -> str:
+        # orjson writes datetimes as ISO 8601 natively; anything else unknown falls back to str()
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def _json_dumps_indented(value) -> str:
+        # Two-space pretty-printing for JSON embedded in AI prompts
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2).decode()
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from fastapi.responses import JSONResponse as _DefaultResponse
+    _json_loads = json.loads
+
+    def _json_dumps(value) -> str:
+        return json.dumps(value, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o))
+
+    def _json_dumps_indented(value) -> str:
+        return json.dumps(value, indent=2, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o))
+
+    ORJSON_AVAILABLE = False
+
+# Try to import selectolax (lexbor), fallback to stdlib HTMLParser if not available
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Try to import pyarrow for its multi-threaded CSV reader, fallback to the csv module if not available
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Try to import pyahocorasick for single-pass keyword scans, fallback to substring checks
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 
 # ═══════════════════════════════════════════════════════════════
 # 2. CONFIGURATION
 # ═══════════════════════════════════════════════════════════════
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logging.basicConfig(format="%(message)s")
+logger = logging.getLogger("plc_autoconfig")
+logger.setLevel(LOG_LEVEL)
+
 AI_MODEL = "claude-sonnet-4-20250514"
 AI_TIMEOUT = 45.0
 AI_MAX_TOKENS = 3000
 SCRAPE_TIME_LIMIT = 45
 SCRAPE_MAX_PAGES_PER_PASS = 30
+SCRAPE_CONCURRENCY = 4  # Pages fetched at once per crawl batch, sharing the crawler's connection pool
 # (set in CONFIGURATION section)
 TEXT_PER_PAGE = 8000
 COMBINED_TEXT_CAP = 150000
@@ -47,12 +114,32 @@ AI_INPUT_CAP = 40000
 RAW_TEXT_CAP = 15000
 RESEARCH_CAP = 10000
 UPLOAD_DIR = "/tmp/plc-uploads"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+KV_FILE_CONTENT_CAP = 500000  # Max characters of CSV text persisted to KV per file
+CSV_DISTINCT_CAP = 50000  # Max distinct values tracked per CSV column
+CSV_READ_BLOCK_SIZE = 1024 * 1024  # Bytes read and decoded per block when parsing CSVs from disk
+CSV_PARSE_CACHE_TTL = 86400  # Seconds parsed CSV metadata stays cached in KV, keyed by file content hash
+AI_EXTRACT_CACHE_TTL = 86400  # Seconds a data-source AI extraction stays cached in KV, keyed by model + prompt hash
+CSV_DATA_CAP = 50000  # Max characters of combined CSV summaries passed between analysis steps
+MAX_CONCURRENT_UPLOADS = int(os.getenv("MAX_CONCURRENT_UPLOADS", "4"))
+MAX_CONCURRENT_PREVIEWS = int(os.getenv("MAX_CONCURRENT_PREVIEWS", "8"))
+MAX_CONCURRENT_AI_EXTRACTIONS = int(os.getenv("MAX_CONCURRENT_AI_EXTRACTIONS", "4"))
+HEALTH_CACHE_TTL = 10  # Seconds a computed /api/health response is reused
 
 
 # ═══════════════════════════════════════════════════════════════
 # 4. UTILITIES (Helpers)
 # ═══════════════════════════════════════════════════════════════
 
+def _short_id() -> str:
+    """Generate an 8-character hex ID from 4 random bytes.
+
+    Returns:
+        Random lowercase hex string, e.g. "3f9a01bc"
+    """
+    return os.urandom(4).hex()
+
+
 def _normalize_url(url: str) -> str:
     """Normalize a URL by ensuring it has a protocol.
 
@@ -70,6 +157,59 @@ def _normalize_url(url: str) -> str:
     return url
 
 
+# Characters that matter when balancing a JSON block: brackets, quotes and escapes
+_JSON_TOKEN_RE = re.compile(r'[\[\]{}"\\]')
+
+
+def _extract_json_block(text: str, open_ch: str = "[", close_ch: str = "]") -> Optional[str]:
+    """Return the first balanced open_ch...close_ch block in text, or None.
+
+    One forward scan that jumps between bracket/quote characters and ignores brackets
+    inside JSON strings, so trailing prose after the block doesn't get swallowed.
+    """
+    start = text.find(open_ch)
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = -1
+    for m in _JSON_TOKEN_RE.finditer(text, start):
+        pos = m.start()
+        if pos == escaped:
+            continue
+        ch = text[pos]
+        if in_string:
+            if ch == '\\':
+                escaped = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return None
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _decode_json_at(text: str, open_ch: str):
+    """Decode the JSON value starting at the first open_ch in text, or return None.
+
+    raw_decode parses from that offset and stops at the end of the value, so there is
+    no separate bracket scan or substring copy. Raises json.JSONDecodeError if the
+    text at that offset is not valid JSON.
+    """
+    start = text.find(open_ch)
+    if start == -1:
+        return None
+    return _JSON_DECODER.raw_decode(text, start)[0]
+
+
 def _extract_json_from_text(text: str, json_type: str = "auto") -> Optional[Dict]:
     """Extract JSON from text, handling both list and object formats.
     
@@ -84,22 +224,24 @@ def _extract_json_from_text(text: str, json_type: str = "auto") -> Optional[Dict
         return None
 
     try:
-        # Try direct JSON parse first
-        return json.loads(text)
+        # Try direct JSON parse first: a response that is only JSON needs no scan
+        parsed = json.loads(text)
+        if json_type == "auto" or isinstance(parsed, list if json_type == "list" else dict):
+            return parsed
     except (json.JSONDecodeError, ValueError, TypeError):
         pass
     
     # Try to extract JSON from text
     try:
         if json_type == "list" or json_type == "auto":
-            match = re.search(r'\[.*\]', text, re.DOTALL)
-            if match:
-                return json.loads(match.group())
+            parsed = _decode_json_at(text, "[")
+            if parsed is not None:
+                return parsed
         
         if json_type == "object" or json_type == "auto":
-            match = re.search(r'\{.*\}', text, re.DOTALL)
-            if match:
-                return json.loads(match.group())
+            parsed = _decode_json_at(text, "{")
+            if parsed is not None:
+                return parsed
     except json.JSONDecodeError:
         pass
     
@@ -124,6 +266,27 @@ def _get_project_or_404(project_id: str):
     return project
 
 
+async def _get_project_with_retry(project_id: str, tries: int = 2, delay: float = 0.25):
+    """Get a project, retrying once briefly to ride out Vercel cold starts.
+
+    Args:
+        project_id: The project ID to retrieve
+        tries: Number of lookup attempts
+        delay: Seconds to wait between attempts (non-blocking)
+
+    Returns:
+        The Project object, or None if it never appeared
+    """
+    for attempt in range(tries):
+        project = await store.get_project_async(project_id)
+        if project:
+            return project
+        if attempt < tries - 1:
+            logger.debug("[STORE] Project %s not found on attempt %s/%s, retrying...", project_id, attempt + 1, tries)
+            await asyncio.sleep(delay)
+    return None
+
+
 async def _parse_json_body(request: Request) -> dict:
     """Parse JSON from request body.
     
@@ -137,7 +300,7 @@ async def _parse_json_body(request: Request) -> dict:
         HTTPException with status 400 if JSON is invalid
     """
     try:
-        body = await request.json()
+        body = _json_loads(await request.body())
         return body if isinstance(body, dict) else {}
     except (json.JSONDecodeError, ValueError):
         raise HTTPException(status_code=400, detail="Invalid JSON in request body")
@@ -198,7 +361,7 @@ def _format_research_for_analysis(research: dict) -> str:
 
 class Condition(BaseModel):
     """Conditional logic rule: if field X has value Y, then do Z"""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     source_field: str = ""
     operator: str = "equals"
     value: Any = None
@@ -206,7 +369,7 @@ class Condition(BaseModel):
 
 
 class FormField(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     field_type: str
     required: bool = True
@@ -216,7 +379,7 @@ class FormField(BaseModel):
 
 
 class WorkflowStep(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     order: int
     assigned_role: str = ""
@@ -226,8 +389,12 @@ class WorkflowStep(BaseModel):
     conditions: List[Condition] = []
 
 
+# Sort key for workflow steps (C-level attribute fetch instead of a lambda)
+_STEP_ORDER_KEY = attrgetter("order")
+
+
 class Fee(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     amount: float
     fee_type: str
@@ -237,7 +404,7 @@ class Fee(BaseModel):
 
 
 class RequiredDocument(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     required: bool = True
     description: str = ""
@@ -246,7 +413,7 @@ class RequiredDocument(BaseModel):
 
 
 class RecordType(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     description: str = ""
     department_id: str = ""
@@ -258,14 +425,14 @@ class RecordType(BaseModel):
 
 
 class Department(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     description: str = ""
     record_type_ids: List[str] = []
 
 
 class UserRole(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     description: str = ""
     permissions: List[str] = []
@@ -288,8 +455,14 @@ class Configuration(BaseModel):
     summary: str = ""
 
 
+# Serialize whole lists of models in one pydantic-core call instead of per-item model_dump
+_RECORD_TYPES_ADAPTER = TypeAdapter(List[RecordType])
+_DEPARTMENTS_ADAPTER = TypeAdapter(List[Department])
+_USER_ROLES_ADAPTER = TypeAdapter(List[UserRole])
+
+
 class DataSource(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     source_type: str  # "municipal_code", "existing_form", "fee_schedule", "peer_template"
     name: str
     status: str = "pending"  # "pending", "processing", "completed", "error"
@@ -301,7 +474,7 @@ class DataSource(BaseModel):
     error_message: Optional[str] = ""
 
 class ValidationFinding(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     severity: str  # "critical", "warning", "info", "success"
     category: str  # "completeness", "workflow", "fees", "documents", "best_practice"
     title: str
@@ -312,7 +485,7 @@ class ValidationFinding(BaseModel):
     fix_data: Optional[Dict[str, Any]] = None
 
 class ReconciliationItem(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     action: str  # "add", "update", "flag"
     target: str  # "record_type", "fee", "form_field", "document", "workflow_step", "department"
     target_id: Optional[str] = ""
@@ -326,7 +499,7 @@ class ReconciliationItem(BaseModel):
 
 
 class Project(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    id: str = Field(default_factory=_short_id)
     name: str
     customer_name: str
     product_type: str = "PLC"
@@ -439,11 +612,11 @@ try:
         _redis_client = UpstashRedis(url=_kv_url, token=_kv_token)
         KV_AVAILABLE = True
         _redis_mode = "upstash"
-        print(f"[KV] Upstash Redis connected: {_kv_url[:40]}...")
+        logger.info("[KV] Upstash Redis connected: %s...", _kv_url[:40])
 except ImportError:
     pass
 except Exception as e:
-    print(f"[KV] Upstash connection failed: {e}")
+    logger.warning("[KV] Upstash connection failed: %s", e)
 
 # --- Attempt 2: Standard Redis via REDIS_URL ---
 if not KV_AVAILABLE:
@@ -456,15 +629,15 @@ if not KV_AVAILABLE:
             KV_AVAILABLE = True
             _redis_mode = "standard"
             _redis_client = _std_redis
-            print(f"[KV] Standard Redis connected: {_redis_url[:40]}...")
+            logger.info("[KV] Standard Redis connected: %s...", _redis_url[:40])
         except ImportError:
-            print("[WARNING] redis package not installed. Run: pip install redis")
+            logger.warning("[WARNING] redis package not installed. Run: pip install redis")
         except Exception as e:
-            print(f"[KV] Standard Redis connection failed: {e}")
+            logger.warning("[KV] Standard Redis connection failed: %s", e)
 
 if not KV_AVAILABLE:
-    print("[WARNING] No Redis configured. Data will be lost on cold start!")
-    print("[WARNING] Set REDIS_URL or KV_REST_API_URL + KV_REST_API_TOKEN for persistence.")
+    logger.warning("[WARNING] No Redis configured. Data will be lost on cold start!")
+    logger.warning("[WARNING] Set REDIS_URL or KV_REST_API_URL + KV_REST_API_TOKEN for persistence.")
 
 
 def _kv_get(key):
@@ -474,26 +647,59 @@ def _kv_get(key):
     try:
         result = _redis_client.get(key)
         if result and isinstance(result, str):
-            return json.loads(result)
+            return _json_loads(result)
         return result
     except Exception as e:
-        print(f"[KV] GET error for {key}: {e}")
+        logger.warning("[KV] GET error for %s: %s", key, e)
         return None
 
 
-def _kv_set(key, value):
-    """SET to Redis (supports both Upstash REST and standard Redis)"""
+def _kv_mget(keys):
+    """GET several keys in one round-trip; missing keys come back as None"""
+    if not keys or not KV_AVAILABLE or not _redis_client:
+        return [None] * len(keys)
+    try:
+        results = _redis_client.mget(*keys)
+        return [_json_loads(r) if r and isinstance(r, str) else r for r in results]
+    except Exception as e:
+        logger.warning("[KV] MGET error for %s: %s", keys, e)
+        return [None] * len(keys)
+
+
+def _kv_set(key, value, ex=None):
+    """SET to Redis (supports both Upstash REST and standard Redis); ex is an optional TTL in seconds"""
     if not KV_AVAILABLE or not _redis_client:
         return False
     try:
-        encoded = json.dumps(value, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o))
-        _redis_client.set(key, encoded)
+        encoded = _json_dumps(value)
+        _redis_client.set(key, encoded, ex=ex)
         return True
     except Exception as e:
-        print(f"[KV] SET error for {key}: {e}")
+        logger.warning("[KV] SET error for %s: %s", key, e)
         return False
 
 
+# Strong references to in-flight background writes so they aren't garbage-collected
+_bg_tasks = set()
+
+
+async def _safe_kv_set(key, value):
+    """SET to Redis from a worker thread; errors are logged, never raised."""
+    try:
+        if await asyncio.to_thread(_kv_set, key, value):
+            logger.debug("[KV] Stored %s in background", key)
+    except Exception as e:
+        logger.warning("[KV] Background SET error for %s: %s", key, e)
+
+
+def _kv_set_background(key, value):
+    """Schedule a fire-and-forget SET so callers don't wait on the KV round-trip."""
+    task = asyncio.create_task(_safe_kv_set(key, value))
+    _bg_tasks.add(task)
+    task.add_done_callback(_bg_tasks.discard)
+    return task
+
+
 def _kv_delete(key):
     """DELETE from Redis (supports both Upstash REST and standard Redis)"""
     if not KV_AVAILABLE or not _redis_client:
@@ -502,7 +708,7 @@ def _kv_delete(key):
         _redis_client.delete(key)
         return True
     except Exception as e:
-        print(f"[KV] DEL error for {key}: {e}")
+        logger.warning("[KV] DEL error for %s: %s", key, e)
         return False
 
 
@@ -514,7 +720,7 @@ def _kv_keys(pattern="project:*"):
         keys = _redis_client.keys(pattern)
         return keys if keys else []
     except Exception as e:
-        print(f"[KV] KEYS error for {pattern}: {e}")
+        logger.warning("[KV] KEYS error for %s: %s", pattern, e)
         return []
 
 
@@ -528,13 +734,13 @@ def _save_project_file(project_id: str, data: dict):
     """Save a single project to its own /tmp file."""
     try:
         path = _project_file_path(project_id)
-        encoded = json.dumps(data, default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o))
+        encoded = _json_dumps(data)
         with open(path, "w") as f:
             f.write(encoded)
             f.flush()
             os.fsync(f.fileno())
     except Exception as e:
-        print(f"[DISK] Error saving project file {project_id}: {e}")
+        logger.warning("[DISK] Error saving project file %s: %s", project_id, e)
 
 
 def _load_project_file(project_id: str) -> dict:
@@ -545,7 +751,7 @@ def _load_project_file(project_id: str) -> dict:
             with open(path, "r") as f:
                 return json.loads(f.read())
     except Exception as e:
-        print(f"[DISK] Error loading project file {project_id}: {e}")
+        logger.warning("[DISK] Error loading project file %s: %s", project_id, e)
     return None
 
 
@@ -563,42 +769,68 @@ class InMemoryStore:
 
     def __init__(self):
         self._projects = {}
+        # Validated Project models for get_project_model: project_id -> (raw dict, version, model).
+        # A write bumps the version; a reload replaces the raw dict, so either one invalidates
+        self._models = {}
+        self._versions = {}
         self._load_from_disk()
-        # Try to recover projects from KV after cold start
-        self._recover_from_kv()
+        # KV recovery runs as a background warm-up at startup (see warm_cache)
 
-    def _load_from_disk(self):
-        """Load from /tmp as fallback cache."""
+    def _read_from_disk(self, skip=()) -> dict:
+        """Read projects from /tmp without touching self._projects (safe in a worker thread).
+
+        Per-project files whose id is in skip are not opened.
+        """
+        found = {}
         # Load from legacy monolithic file
         try:
             if os.path.exists(STORE_PATH):
                 with open(STORE_PATH, "r") as f:
                     data = json.load(f)
-                self._projects.update(data.get("projects", {}))
+                found.update(data.get("projects", {}))
         except Exception:
             pass
         # Also load from per-project files
         for pid in _list_project_files():
-            if pid not in self._projects:
+            if pid not in found and pid not in skip:
                 data = _load_project_file(pid)
                 if data:
-                    self._projects[pid] = data
+                    found[pid] = data
+        return found
 
-    def _recover_from_kv(self):
-        """Try to recover projects from KV after cold start."""
+    def _read_from_kv(self, skip=()) -> dict:
+        """Fetch every KV project whose id is not in skip, without touching self._projects."""
+        found = {}
         if not KV_AVAILABLE:
-            return
+            return found
         try:
             # Get list of project IDs from KV
             project_list = _kv_get("project_list") or []
             for pid in project_list:
-                if pid not in self._projects:
+                if pid not in skip and pid not in found:
                     project_data = _kv_get(f"project:{pid}")
                     if project_data:
-                        self._projects[pid] = project_data
-                        print(f"[KV] Recovered project {pid} from KV on cold start")
+                        found[pid] = project_data
         except Exception as e:
-            print(f"[KV] Recovery failed: {e}")
+            logger.warning("[KV] Recovery failed: %s", e)
+        return found
+
+    def _merge_missing(self, found: dict) -> list:
+        """Add loaded projects that are still absent from memory; returns the ids added.
+
+        Only called on the event loop thread. Projects already in memory are never
+        replaced: every write goes to memory first, so the loaded copy can only be older.
+        """
+        added = []
+        for pid, data in found.items():
+            if pid not in self._projects:
+                self._projects[pid] = data
+                added.append(pid)
+        return added
+
+    def _load_from_disk(self):
+        """Load from /tmp as fallback cache."""
+        self._merge_missing(self._read_from_disk(skip=self._projects))
 
     def _save_to_disk(self):
         """Save to /tmp as local cache (both monolithic and per-project)."""
@@ -614,35 +846,50 @@ class InMemoryStore:
 
     def _persist_project(self, project_id):
         """Save single project to KV + per-project /tmp file + monolithic file."""
+        self._versions[project_id] = self._versions.get(project_id, 0) + 1
         if project_id in self._projects:
             _kv_set(f"project:{project_id}", self._projects[project_id])
             # Always save per-project file as fallback
             _save_project_file(project_id, self._projects[project_id])
         self._save_to_disk()
 
-    def _load_project_from_kv(self, project_id):
-        """Try to load a project from KV if not in memory."""
+    def _read_project(self, project_id):
+        """Read one project from KV or its /tmp file without touching self._projects."""
         if not KV_AVAILABLE:
             # Fallback: try per-project /tmp file
             data = _load_project_file(project_id)
             if data:
-                print(f"[STORE] Loaded project {project_id} from /tmp file (name={data.get('name', '?')})")
-                self._projects[project_id] = data
-                return True
-            print(f"[STORE] KV not available and no /tmp file for project {project_id}")
-            return False
+                logger.debug("[STORE] Loaded project %s from /tmp file (name=%s)", project_id, data.get('name', '?'))
+                return data
+            logger.debug("[STORE] KV not available and no /tmp file for project %s", project_id)
+            return None
         data = _kv_get(f"project:{project_id}")
         if data:
-            print(f"[STORE] Loaded project {project_id} from KV (name={data.get('name', '?')})")
-            self._projects[project_id] = data
-            return True
+            logger.debug("[STORE] Loaded project %s from KV (name=%s)", project_id, data.get('name', '?'))
+            return data
         # Even with KV available, check /tmp file as last resort
         data = _load_project_file(project_id)
         if data:
-            print(f"[STORE] Loaded project {project_id} from /tmp file fallback (name={data.get('name', '?')})")
-            self._projects[project_id] = data
+            logger.debug("[STORE] Loaded project %s from /tmp file fallback (name=%s)", project_id, data.get('name', '?'))
+            return data
+        logger.warning("[STORE] Project %s not found in KV or /tmp", project_id)
+        return None
+
+    def _read_fallback(self, project_id) -> dict:
+        """The reads get_project falls back to (all of /tmp, then KV), for a worker thread."""
+        found = self._read_from_disk(skip=self._projects)
+        if project_id not in found:
+            data = self._read_project(project_id)
+            if data:
+                found[project_id] = data
+        return found
+
+    def _load_project_from_kv(self, project_id):
+        """Try to load a project from KV if not in memory."""
+        data = self._read_project(project_id)
+        if data:
+            self._merge_missing({project_id: data})
             return True
-        print(f"[STORE] Project {project_id} not found in KV or /tmp")
         return False
 
     def create_project(self, project: Project) -> Project:
@@ -661,23 +908,42 @@ class InMemoryStore:
                     project_list.append(project.id)
                     _kv_set("project_list", project_list)
             except Exception as e:
-                print(f"[KV] Failed to update project_list: {e}")
+                logger.warning("[KV] Failed to update project_list: %s", e)
 
         return project
 
+    async def warm_cache(self):
+        """Pull every known project from KV into memory after a cold start.
+
+        The KV reads run in a worker thread and the results are merged here on the loop,
+        so requests served during warm-up never see self._projects change underneath them.
+        """
+        found = await asyncio.to_thread(self._read_from_kv, self._projects)
+        for pid in self._merge_missing(found):
+            logger.info("[KV] Recovered project %s from KV on cold start", pid)
+
+    async def get_project_async(self, project_id: str) -> Optional[Project]:
+        """get_project that does disk/KV fallback lookups off the event loop."""
+        if project_id not in self._projects:
+            self._merge_missing(await asyncio.to_thread(self._read_fallback, project_id))
+        if project_id not in self._projects:
+            logger.warning("[STORE] Project %s not found in memory, disk, or KV | KV_AVAILABLE=%s", project_id, KV_AVAILABLE)
+            return None
+        return self.get_project(project_id)
+
     def get_project(self, project_id: str) -> Optional[Project]:
         if project_id not in self._projects:
             self._load_from_disk()
         if project_id not in self._projects:
             self._load_project_from_kv(project_id)
         if project_id not in self._projects:
-            print(f"[STORE] Project {project_id} not found in memory, disk, or KV | KV_AVAILABLE={KV_AVAILABLE}")
+            logger.warning("[STORE] Project %s not found in memory, disk, or KV | KV_AVAILABLE=%s", project_id, KV_AVAILABLE)
             return None
         try:
             return Project(**self._projects[project_id])
         except Exception as e:
             # Don't silently lose projects — try to repair the data
-            print(f"[STORE] Project {project_id} deserialization error: {e}")
+            logger.warning("[STORE] Project %s deserialization error: %s", project_id, e)
             try:
                 # Try to fix common issues: datetime strings, missing fields
                 data = dict(self._projects[project_id])
@@ -703,7 +969,7 @@ class InMemoryStore:
                             data[dt_field] = datetime.utcnow()
                 return Project(**data)
             except Exception as e2:
-                print(f"[STORE] Project {project_id} repair also failed: {e2}")
+                logger.warning("[STORE] Project %s repair also failed: %s", project_id, e2)
                 # Last resort: return a minimal project with at least the ID and basic data
                 try:
                     raw = self._projects[project_id]
@@ -715,9 +981,26 @@ class InMemoryStore:
                         community_url=raw.get("community_url", ""),
                     )
                 except Exception as e3:
-                    print(f"[STORE] Project {project_id} minimal reconstruction failed: {e3}")
+                    logger.warning("[STORE] Project %s minimal reconstruction failed: %s", project_id, e3)
                     return None
 
+    def get_project_model(self, project_id: str) -> Optional[Project]:
+        """get_project, reusing the validated model while the stored project is unchanged.
+
+        The instance is shared between requests, so callers must treat it as read-only;
+        handlers that modify the project use get_project and write through the store.
+        """
+        self._ensure_project(project_id)
+        raw = self._projects.get(project_id)
+        version = self._versions.get(project_id, 0)
+        cached = self._models.get(project_id)
+        if raw is not None and cached is not None and cached[0] is raw and cached[1] == version:
+            return cached[2]
+        model = self.get_project(project_id)
+        if model is not None and raw is not None:
+            self._models[project_id] = (raw, version, model)
+        return model
+
     def list_projects(self) -> List[Project]:
         self._load_from_disk()
         # Also load from KV if available
@@ -750,9 +1033,22 @@ class InMemoryStore:
         self._persist_project(project_id)
         return Project(**self._projects[project_id])
 
+    def append_data_source(self, project_id: str, source: dict) -> None:
+        """Append one data source to the stored project without rewriting the list."""
+        self._ensure_project(project_id)
+        if project_id not in self._projects:
+            raise ValueError(f"Project {project_id} not found")
+        project = self._projects[project_id]
+        if project.get("data_sources") is None:
+            project["data_sources"] = []
+        project["data_sources"].append(source)
+        project["updated_at"] = datetime.utcnow().isoformat()
+        self._persist_project(project_id)
+
     def delete_project(self, project_id: str) -> bool:
         if project_id in self._projects:
             del self._projects[project_id]
+            self._models.pop(project_id, None)
             _kv_delete(f"project:{project_id}")
 
             # Remove from project_list in KV
@@ -763,7 +1059,7 @@ class InMemoryStore:
                         project_list.remove(project_id)
                         _kv_set("project_list", project_list)
                 except Exception as e:
-                    print(f"[KV] Failed to update project_list on delete: {e}")
+                    logger.warning("[KV] Failed to update project_list on delete: %s", e)
 
             self._save_to_disk()
             return True
@@ -862,15 +1158,22 @@ class InMemoryStore:
         return False
 
     def add_uploaded_file(self, project_id: str, file_info: UploadedFile) -> None:
+        self.extend_uploaded_files(project_id, [file_info])
+
+    def extend_uploaded_files(self, project_id: str, files: List[UploadedFile], **updates) -> None:
+        """Append several uploaded files (and optional field updates) with a single persist."""
         self._ensure_project(project_id)
         if project_id not in self._projects:
             raise ValueError(f"Project {project_id} not found")
-        file_dict = file_info.model_dump()
-        for key in ["upload_time"]:
-            if isinstance(file_dict.get(key), datetime):
-                file_dict[key] = file_dict[key].isoformat()
-        self._projects[project_id]["uploaded_files"].append(file_dict)
-        self._projects[project_id]["updated_at"] = datetime.utcnow().isoformat()
+        project = self._projects[project_id]
+        for file_info in files:
+            file_dict = file_info.model_dump()
+            for key in ["upload_time"]:
+                if isinstance(file_dict.get(key), datetime):
+                    file_dict[key] = file_dict[key].isoformat()
+            project["uploaded_files"].append(file_dict)
+        project.update(updates)
+        project["updated_at"] = datetime.utcnow().isoformat()
         self._persist_project(project_id)
 
 
@@ -885,38 +1188,146 @@ class CSVParser:
     @staticmethod
     def parse(content: str) -> dict:
         """Parse CSV and extract metadata for AI analysis"""
-        reader = csv.DictReader(io.StringIO(content))
-        rows = list(reader)
+        return CSVParser.parse_stream(io.StringIO(content))
+
+    @staticmethod
+    def parse_file(path) -> dict:
+        """Parse a CSV file on disk without reading it into memory first"""
+        if PYARROW_AVAILABLE:
+            try:
+                return CSVParser.parse_arrow(path)
+            except (ValueError, pa.ArrowException):
+                # Ragged rows, duplicate headers or invalid UTF-8 are all
+                # tolerated by the csv module, so fall back to it
+                pass
+        return CSVParser.parse_stream(CSVParser._iter_file_lines(path))
+
+    @staticmethod
+    def parse_arrow(path) -> dict:
+        """Parse a CSV file with pyarrow's reader, one record batch at a time.
+        Produces the same metadata as parse_stream, reading every column as text"""
+        with open(path, "r", encoding="utf-8-sig", errors="ignore", newline="") as fp:
+            columns = next(csv.reader(fp), [])
+        if not columns or len(set(columns)) != len(columns):
+            raise ValueError("CSV header is empty or has duplicate column names")
+
+        reader = pacsv.open_csv(
+            path,
+            # Name the columns ourselves so column_types always matches the
+            # header as read above
+            read_options=pacsv.ReadOptions(
+                use_threads=True,
+                block_size=CSV_READ_BLOCK_SIZE,
+                column_names=columns,
+                skip_rows=1,
+            ),
+            convert_options=pacsv.ConvertOptions(
+                column_types={col: pa.string() for col in columns},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+
+        distinct = {col: set() for col in columns}
+        totals = {col: 0 for col in columns}
+        numeric_checked = {col: 0 for col in columns}
+        is_numeric = {col: True for col in columns}
+        sample_rows = []
+        total_rows = 0
+
+        for batch in reader:
+            total_rows += batch.num_rows
+            if len(sample_rows) < 15:
+                sample_rows.extend(batch.slice(0, 15 - len(sample_rows)).to_pylist())
+            for i, col in enumerate(columns):
+                values = batch.column(i)
+                values = values.filter(pc.not_equal(values, ""))
+                totals[col] += len(values)
+                if len(distinct[col]) < CSV_DISTINCT_CAP:
+                    for v in pc.unique(values).to_pylist():
+                        if len(distinct[col]) >= CSV_DISTINCT_CAP:
+                            break
+                        distinct[col].add(v)
+                if is_numeric[col] and numeric_checked[col] < 20:
+                    for v in values.slice(0, 20 - numeric_checked[col]).to_pylist():
+                        numeric_checked[col] += 1
+                        if not v.replace('.', '', 1).replace('-', '', 1).replace(',', '').isdigit():
+                            is_numeric[col] = False
+                            break
+
+        return CSVParser._build_metadata(columns, total_rows, sample_rows, distinct, totals, is_numeric)
+
+    @staticmethod
+    def _iter_file_lines(path):
+        """Yield newline-terminated lines from a UTF-8 file (dropping any BOM),
+        decoding CSV_READ_BLOCK_SIZE bytes at a time instead of per small text chunk"""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="ignore")
+        pending = ""
+        with open(path, "rb") as raw:
+            while True:
+                block = raw.read(CSV_READ_BLOCK_SIZE)
+                text = pending + decoder.decode(block, final=not block)
+                if not block:
+                    if text:
+                        yield text
+                    return
+                lines = text.split("\n")
+                pending = lines.pop()
+                for line in lines:
+                    yield line + "\n"
+
+    @staticmethod
+    def parse_stream(fp) -> dict:
+        """Parse CSV row by row from a text stream or line iterable; memory is
+        bounded by CSV_DISTINCT_CAP values per column rather than the file size"""
+        reader = csv.DictReader(fp)
         columns = reader.fieldnames or []
 
+        distinct = {col: set() for col in columns}
+        totals = {col: 0 for col in columns}
+        numeric_checked = {col: 0 for col in columns}
+        is_numeric = {col: True for col in columns}
+        sample_rows = []
+        total_rows = 0
+
+        for row in reader:
+            total_rows += 1
+            if total_rows <= 15:
+                sample_rows.append(row)
+            for col in columns:
+                v = row.get(col)
+                if not v:
+                    continue
+                # Past the cap, unique_count becomes a lower bound; this keeps
+                # memory flat on high-cardinality columns like permit numbers
+                if len(distinct[col]) < CSV_DISTINCT_CAP:
+                    distinct[col].add(v)
+                totals[col] += 1
+                # Numeric sniffing only looks at the first 20 non-empty values
+                if is_numeric[col] and numeric_checked[col] < 20:
+                    numeric_checked[col] += 1
+                    if not v.replace('.', '', 1).replace('-', '', 1).replace(',', '').isdigit():
+                        is_numeric[col] = False
+
+        return CSVParser._build_metadata(columns, total_rows, sample_rows, distinct, totals, is_numeric)
+
+    @staticmethod
+    def _build_metadata(columns, total_rows, sample_rows, distinct, totals, is_numeric) -> dict:
         column_analysis = {}
         for col in columns:
-            values = [r.get(col, "") for r in rows if r.get(col)]
-            unique_count = len(set(values))
-            sample_values = list(set(values))[:10]
-
-            is_numeric = True
-            if values:
-                for v in values[:20]:
-                    if v and not v.replace('.', '', 1).replace('-', '', 1).replace(',', '').isdigit():
-                        is_numeric = False
-                        break
-
             is_date = any(kw in col.lower() for kw in ["date", "time", "created", "submitted", "approved"])
 
             column_analysis[col] = {
-                "unique_count": unique_count,
-                "total_count": len(values),
-                "sample_values": sample_values,
-                "appears_numeric": is_numeric,
+                "unique_count": len(distinct[col]),
+                "total_count": totals[col],
+                "sample_values": list(distinct[col])[:10],
+                "appears_numeric": is_numeric[col],
                 "appears_date": is_date,
             }
 
-        sample_rows = rows[:15]
-
         return {
             "columns": columns,
-            "total_rows": len(rows),
+            "total_rows": total_rows,
             "sample_rows": sample_rows,
             "column_analysis": column_analysis,
         }
@@ -957,14 +1368,14 @@ def summarize_web_content(scraped_data: dict, community_name: str = "") -> dict:
     This is the 'first pass' of the two-pass AI approach.
     """
     if not ANTHROPIC_AVAILABLE or not os.getenv("ANTHROPIC_API_KEY"):
-        print("[AI] Skipping web content summarization: AI not available")
+        logger.info("[AI] Skipping web content summarization: AI not available")
         return None
 
     pages = scraped_data.get("pages", [])
     combined_text = scraped_data.get("combined_text", "")
 
     if not combined_text and not pages:
-        print("[AI] No scraped content to summarize")
+        logger.info("[AI] No scraped content to summarize")
         return None
 
     # Build text from top pages by relevance (cap at 30KB for Claude)
@@ -1024,7 +1435,7 @@ IMPORTANT:
 - Be exhaustive — extract every data point you can find. The thoroughness of your extraction directly impacts the quality of the PLC configuration."""
 
     try:
-        print(f"[AI] Summarizing {len(combined_text)} chars of scraped web content...")
+        logger.info("[AI] Summarizing %s chars of scraped web content...", len(combined_text))
         client = Anthropic(api_key=_sanitize_to_ascii(os.getenv("ANTHROPIC_API_KEY", "")).strip())
         response = client.messages.create(
             model=AI_MODEL,
@@ -1036,7 +1447,7 @@ IMPORTANT:
         try:
             tokens_used = (response.usage.input_tokens or 0) + (response.usage.output_tokens or 0)
             ai_usage_tracker.record_call("web_content_summarization", tokens_used, True)
-            print(f"[AI] Web content summarization complete: {tokens_used} tokens")
+            logger.info("[AI] Web content summarization complete: %s tokens", tokens_used)
         except Exception:
             ai_usage_tracker.record_call("web_content_summarization", 0, True)
 
@@ -1052,15 +1463,15 @@ IMPORTANT:
             structured = json.loads(result_text)
         except json.JSONDecodeError:
             # Try to find JSON object in the response
-            match = re.search(r'\{[\s\S]*\}', result_text)
-            if match:
+            json_block = _extract_json_block(result_text, "{", "}")
+            if json_block:
                 try:
-                    structured = json.loads(match.group(0))
+                    structured = json.loads(json_block)
                 except json.JSONDecodeError:
-                    print(f"[AI] Failed to parse extracted JSON from summarization response")
+                    logger.warning("[AI] Failed to parse extracted JSON from summarization response")
                     return None
             else:
-                print(f"[AI] Failed to parse summarization response as JSON")
+                logger.warning("[AI] Failed to parse summarization response as JSON")
                 return None
 
         # Build the full research format expected by the pipeline
@@ -1095,7 +1506,7 @@ IMPORTANT:
         return research
 
     except Exception as e:
-        print(f"[AI] Error summarizing web content: {e}")
+        logger.warning("[AI] Error summarizing web content: %s", e)
         ai_usage_tracker.record_call("web_content_summarization", 0, False)
         return None
 
@@ -1499,29 +1910,34 @@ def _sanitize_to_ascii(text: str) -> str:
     Government websites sometimes contain Cyrillic look-alikes (e.g. Cyrillic С vs Latin C)
     from copy-pasted Word/PDF content. This prevents encoding errors on ASCII-only runtimes.
     """
-    if not text:
+    if not text or text.isascii():
+        return text
+    # One C-level translate pass instead of a str.replace per homoglyph
+    text = text.translate(_ASCII_HOMOGLYPHS)
+    # Homoglyph mapping alone is usually enough; skip the encode/decode round-trip
+    if text.isascii():
         return text
-    # Common Cyrillic-to-Latin homoglyph mappings
-    homoglyphs = {
-        '\u0410': 'A', '\u0412': 'B', '\u0421': 'C', '\u0415': 'E',
-        '\u041d': 'H', '\u041a': 'K', '\u041c': 'M', '\u041e': 'O',
-        '\u0420': 'P', '\u0422': 'T', '\u0425': 'X',
-        '\u0430': 'a', '\u0435': 'e', '\u043e': 'o', '\u0440': 'p',
-        '\u0441': 'c', '\u0443': 'y', '\u0445': 'x',
-        # Common special characters
-        '\u2013': '-', '\u2014': '--', '\u2018': "'", '\u2019': "'",
-        '\u201c': '"', '\u201d': '"', '\u2022': '-', '\u2026': '...',
-        '\u00ae': '(R)', '\u00a9': '(c)', '\u2122': '(TM)',
-        '\u00b0': ' deg', '\u00bd': '1/2', '\u00bc': '1/4', '\u00be': '3/4',
-        '\u00e9': 'e', '\u00e8': 'e', '\u00f1': 'n', '\u00fc': 'u',
-        '\u00a0': ' ',  # non-breaking space
-    }
-    for old_char, new_char in homoglyphs.items():
-        text = text.replace(old_char, new_char)
     # Drop any remaining non-ASCII characters
     return text.encode('ascii', errors='ignore').decode('ascii')
 
 
+# Common Cyrillic-to-Latin homoglyph mappings
+_ASCII_HOMOGLYPHS = str.maketrans({
+    '\u0410': 'A', '\u0412': 'B', '\u0421': 'C', '\u0415': 'E',
+    '\u041d': 'H', '\u041a': 'K', '\u041c': 'M', '\u041e': 'O',
+    '\u0420': 'P', '\u0422': 'T', '\u0425': 'X',
+    '\u0430': 'a', '\u0435': 'e', '\u043e': 'o', '\u0440': 'p',
+    '\u0441': 'c', '\u0443': 'y', '\u0445': 'x',
+    # Common special characters
+    '\u2013': '-', '\u2014': '--', '\u2018': "'", '\u2019': "'",
+    '\u201c': '"', '\u201d': '"', '\u2022': '-', '\u2026': '...',
+    '\u00ae': '(R)', '\u00a9': '(c)', '\u2122': '(TM)',
+    '\u00b0': ' deg', '\u00bd': '1/2', '\u00bc': '1/4', '\u00be': '3/4',
+    '\u00e9': 'e', '\u00e8': 'e', '\u00f1': 'n', '\u00fc': 'u',
+    '\u00a0': ' ',  # non-breaking space
+})
+
+
 # ============================================================================
 # CLAUDE SERVICE
 # ============================================================================
@@ -1529,6 +1945,76 @@ def _sanitize_to_ascii(text: str) -> str:
 # ═══════════════════════════════════════════════════════════════
 # 6. AI SERVICE
 # ═══════════════════════════════════════════════════════════════
+# Static halves of the configuration prompt; only the data section varies per call
+_PROMPT_PREFIX = """You are a senior implementation consultant specializing in PLC (Permitting, Licensing, and Code Enforcement) software for local governments. You have configured hundreds of municipalities.
+
+Analyze ALL provided data sources and generate the most thorough, production-ready PLC configuration possible.
+
+## Data Sources Provided:
+"""
+
+_PROMPT_SUFFIX = """
+
+## Your Task:
+Create a COMPREHENSIVE PLC configuration. Think like a consultant who has done 100+ implementations. Don't just map what's in the CSV — anticipate what this jurisdiction NEEDS based on:
+- The types of permits/licenses you see in their data
+- Standard requirements for similar municipalities
+- Industry best practices for government workflows
+- Common fee structures for this type of jurisdiction
+- Typical document requirements for each permit/license type
+
+### For EACH Record Type, provide:
+1. **Name & Description**: Clear, professional naming
+2. **Category**: permit, license, code_enforcement, or inspection
+3. **Form Fields** (6-10 per record type): Key applicant and staff fields
+4. **Workflow Steps** (4-6 per record type): Lifecycle from submission to close
+5. **Fees** (2-4 per record type): Realistic fee structures with dollar amounts
+6. **Required Documents** (2-4 per record type): What applicants must submit
+
+### Generate:
+- 5-6 Record Types (building permits, business licenses, code enforcement, and 2-3 specialty permits)
+- 3-5 Departments
+- 4-6 User Roles with permissions
+
+## IMPORTANT RULES:
+- Keep descriptions SHORT (1 sentence max) to keep JSON compact
+- Fee amounts should be realistic ($50-$5000 range)
+- Workflow steps should include assigned roles
+- CRITICAL: Your entire response must be VALID JSON and COMPLETE. Do not get cut off.
+
+## Response Format:
+Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
+{
+  "record_types": [
+    {
+      "name": "string",
+      "description": "string",
+      "category": "permit|license|code_enforcement|inspection",
+      "department": "string",
+      "form_fields": [
+        {"name": "string", "field_type": "text|email|phone|date|number|select|textarea|file|checkbox|address", "required": true/false, "description": "string", "options": ["opt1"] or null}
+      ],
+      "workflow_steps": [
+        {"name": "string", "order": 1, "assigned_role": "string", "status_from": "string or null", "status_to": "string", "actions": ["action1"]}
+      ],
+      "fees": [
+        {"name": "string", "amount": 0.00, "fee_type": "application|processing|permit|inspection|annual", "when_applied": "upfront|upon_approval|upon_inspection|annual"}
+      ],
+      "required_documents": [
+        {"name": "string", "required": true/false, "description": "string", "stage": "application|review|approval|inspection"}
+      ]
+    }
+  ],
+  "departments": [
+    {"name": "string", "description": "string"}
+  ],
+  "user_roles": [
+    {"name": "string", "description": "string", "permissions": ["perm1"], "departments": ["dept1"]}
+  ],
+  "summary": "Brief summary of what was analyzed and generated"
+}"""
+
+
 class ClaudeService:
     def __init__(self):
         raw_key = os.getenv("ANTHROPIC_API_KEY", "")
@@ -1539,8 +2025,8 @@ class ClaudeService:
             clean_key = _sanitize_to_ascii(raw_key).strip()
             if clean_key != raw_key:
                 bad_chars = [(i, repr(ch)) for i, ch in enumerate(raw_key) if ord(ch) > 127]
-                print(f"[AI] WARNING: ANTHROPIC_API_KEY contains non-ASCII characters at positions: {bad_chars}")
-                print(f"[AI] Auto-cleaned API key (was {len(raw_key)} chars, now {len(clean_key)} chars)")
+                logger.warning("[AI] WARNING: ANTHROPIC_API_KEY contains non-ASCII characters at positions: %s", bad_chars)
+                logger.info("[AI] Auto-cleaned API key (was %s chars, now %s chars)", len(raw_key), len(clean_key))
             self.api_key = clean_key
         else:
             self.api_key = ""
@@ -1551,15 +2037,15 @@ class ClaudeService:
         if ANTHROPIC_AVAILABLE and self.api_key:
             try:
                 self.client = Anthropic(api_key=self.api_key)
-                print(f"[AI] Claude service initialized with API key ({self.api_key[:12]}...)")
+                logger.info("[AI] Claude service initialized with API key (%s...)", self.api_key[:12])
             except Exception as e:
-                print(f"[AI] Failed to initialize Anthropic client: {e}")
+                logger.warning("[AI] Failed to initialize Anthropic client: %s", e)
                 self.last_error = str(e)
         else:
             if not ANTHROPIC_AVAILABLE:
-                print("[AI] WARNING: anthropic package not installed - using mock mode")
+                logger.warning("[AI] WARNING: anthropic package not installed - using mock mode")
             elif not self.api_key:
-                print("[AI] WARNING: ANTHROPIC_API_KEY not set - using mock mode")
+                logger.warning("[AI] WARNING: ANTHROPIC_API_KEY not set - using mock mode")
 
     def is_available(self) -> bool:
         return self.client is not None and bool(self.api_key)
@@ -1581,7 +2067,7 @@ class ClaudeService:
             self.last_mode = "mock"
             reason = "anthropic package not installed" if not ANTHROPIC_AVAILABLE else "ANTHROPIC_API_KEY not configured"
             self.last_error = reason
-            print(f"[AI] Using MOCK configuration: {reason}")
+            logger.info("[AI] Using MOCK configuration: %s", reason)
             config = MockGenerator.generate_configuration()
             config.summary = f"[MOCK DATA] {reason}. Configure your Anthropic API key in Vercel environment variables for real AI analysis."
             return config
@@ -1591,7 +2077,7 @@ class ClaudeService:
         prompt = self._build_prompt(trimmed_summary)
 
         try:
-            print(f"[AI] Calling Claude API for configuration analysis ({len(prompt)} chars prompt)...")
+            logger.info("[AI] Calling Claude API for configuration analysis (%s chars prompt)...", len(prompt))
             message = self.client.messages.create(
                 model=AI_MODEL,
                 max_tokens=AI_MAX_TOKENS,
@@ -1604,7 +2090,7 @@ class ClaudeService:
             try:
                 tokens_used = (message.usage.input_tokens or 0) + (message.usage.output_tokens or 0)
                 ai_usage_tracker.record_call("configuration_analysis", tokens_used, True)
-                print(f"[AI] Claude API call successful - {tokens_used} tokens, stop_reason={stop_reason}")
+                logger.info("[AI] Claude API call successful - %s tokens, stop_reason=%s", tokens_used, stop_reason)
             except Exception:
                 ai_usage_tracker.record_call("configuration_analysis", 0, True)
 
@@ -1612,7 +2098,7 @@ class ClaudeService:
 
             # If truncated, ask Claude to complete it
             if stop_reason == 'max_tokens':
-                print("[AI] Response was truncated at max_tokens, requesting continuation...")
+                logger.info("[AI] Response was truncated at max_tokens, requesting continuation...")
                 try:
                     continuation = self.client.messages.create(
                         model=AI_MODEL,
@@ -1625,9 +2111,9 @@ class ClaudeService:
                         ]
                     )
                     response_text += continuation.content[0].text
-                    print(f"[AI] Continuation received, total response: {len(response_text)} chars")
+                    logger.info("[AI] Continuation received, total response: %s chars", len(response_text))
                 except Exception as cont_err:
-                    print(f"[AI] Continuation failed: {cont_err}")
+                    logger.warning("[AI] Continuation failed: %s", cont_err)
 
             config_data = self._parse_response(response_text)
             self.last_mode = "ai"
@@ -1636,78 +2122,14 @@ class ClaudeService:
         except Exception as e:
             self.last_mode = "mock"
             self.last_error = str(e)
-            print(f"[AI] ERROR during Claude API call: {e}")
+            logger.error("[AI] ERROR during Claude API call: %s", e)
             ai_usage_tracker.record_call("configuration_analysis", 0, False)
             config = MockGenerator.generate_configuration()
             config.summary = f"[MOCK DATA - AI Error] {str(e)[:200]}. The AI call failed, showing sample data instead."
             return config
 
     def _build_prompt(self, csv_summary: str) -> str:
-        return f"""You are a senior implementation consultant specializing in PLC (Permitting, Licensing, and Code Enforcement) software for local governments. You have configured hundreds of municipalities.
-
-Analyze ALL provided data sources and generate the most thorough, production-ready PLC configuration possible.
-
-## Data Sources Provided:
-{csv_summary}
-
-## Your Task:
-Create a COMPREHENSIVE PLC configuration. Think like a consultant who has done 100+ implementations. Don't just map what's in the CSV — anticipate what this jurisdiction NEEDS based on:
-- The types of permits/licenses you see in their data
-- Standard requirements for similar municipalities
-- Industry best practices for government workflows
-- Common fee structures for this type of jurisdiction
-- Typical document requirements for each permit/license type
-
-### For EACH Record Type, provide:
-1. **Name & Description**: Clear, professional naming
-2. **Category**: permit, license, code_enforcement, or inspection
-3. **Form Fields** (6-10 per record type): Key applicant and staff fields
-4. **Workflow Steps** (4-6 per record type): Lifecycle from submission to close
-5. **Fees** (2-4 per record type): Realistic fee structures with dollar amounts
-6. **Required Documents** (2-4 per record type): What applicants must submit
-
-### Generate:
-- 5-6 Record Types (building permits, business licenses, code enforcement, and 2-3 specialty permits)
-- 3-5 Departments
-- 4-6 User Roles with permissions
-
-## IMPORTANT RULES:
-- Keep descriptions SHORT (1 sentence max) to keep JSON compact
-- Fee amounts should be realistic ($50-$5000 range)
-- Workflow steps should include assigned roles
-- CRITICAL: Your entire response must be VALID JSON and COMPLETE. Do not get cut off.
-
-## Response Format:
-Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
-{{
-  "record_types": [
-    {{
-      "name": "string",
-      "description": "string",
-      "category": "permit|license|code_enforcement|inspection",
-      "department": "string",
-      "form_fields": [
-        {{"name": "string", "field_type": "text|email|phone|date|number|select|textarea|file|checkbox|address", "required": true/false, "description": "string", "options": ["opt1"] or null}}
-      ],
-      "workflow_steps": [
-        {{"name": "string", "order": 1, "assigned_role": "string", "status_from": "string or null", "status_to": "string", "actions": ["action1"]}}
-      ],
-      "fees": [
-        {{"name": "string", "amount": 0.00, "fee_type": "application|processing|permit|inspection|annual", "when_applied": "upfront|upon_approval|upon_inspection|annual"}}
-      ],
-      "required_documents": [
-        {{"name": "string", "required": true/false, "description": "string", "stage": "application|review|approval|inspection"}}
-      ]
-    }}
-  ],
-  "departments": [
-    {{"name": "string", "description": "string"}}
-  ],
-  "user_roles": [
-    {{"name": "string", "description": "string", "permissions": ["perm1"], "departments": ["dept1"]}}
-  ],
-  "summary": "Brief summary of what was analyzed and generated"
-}}"""
+        return _PROMPT_PREFIX + csv_summary + _PROMPT_SUFFIX
 
     def _repair_json_strings(self, text: str) -> str:
         """Walk through JSON text and fix unescaped quotes inside string values"""
@@ -1801,7 +2223,7 @@ Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
         try:
             return json.loads(text)
         except json.JSONDecodeError as e:
-            print(f"[AI] Direct parse failed: {e}")
+            logger.debug("[AI] Direct parse failed: %s", e)
 
         # Attempt 2: Deep repair — fix unescaped quotes, newlines, trailing commas, etc.
         fixed = text
@@ -1816,7 +2238,7 @@ Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
         try:
             return json.loads(fixed)
         except json.JSONDecodeError as e:
-            print(f"[AI] Repair parse failed: {e}")
+            logger.debug("[AI] Repair parse failed: %s", e)
 
         # Attempt 3: If JSON is truncated, close it
         open_braces = fixed.count('{') - fixed.count('}')
@@ -1829,7 +2251,7 @@ Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
             try:
                 return json.loads(truncated)
             except json.JSONDecodeError as e:
-                print(f"[AI] Truncation repair failed: {e}")
+                logger.debug("[AI] Truncation repair failed: %s", e)
 
         # Attempt 4: Salvage record_types array
         try:
@@ -1879,12 +2301,12 @@ Return ONLY valid JSON (no markdown, no explanation) matching this exact schema:
                             "summary": "Recovered from partial AI response"
                         }
         except (json.JSONDecodeError, ValueError) as e:
-            print(f"[AI] Salvage parse failed: {e}")
+            logger.debug("[AI] Salvage parse failed: %s", e)
 
-        print(f"[AI] JSON parse FAILED. Response length: {len(text)} chars")
-        print(f"[AI] First 500 chars: {text[:500]}")
-        print(f"[AI] Around char 15000: {text[14800:15200] if len(text) > 15200 else 'N/A'}")
-        print(f"[AI] Last 500 chars: {text[-500:]}")
+        logger.warning("[AI] JSON parse FAILED. Response length: %s chars", len(text))
+        logger.debug("[AI] First 500 chars: %s", text[:500])
+        logger.debug("[AI] Around char 15000: %s", text[14800:15200] if len(text) > 15200 else 'N/A')
+        logger.debug("[AI] Last 500 chars: %s", text[-500:])
         raise ValueError("Could not parse Claude response as JSON after all recovery attempts")
 
     def _build_configuration(self, data: dict) -> Configuration:
@@ -1954,7 +2376,18 @@ claude_service = ClaudeService()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     os.makedirs(UPLOAD_DIR, exist_ok=True)
+    # Warm the project cache from KV while the instance starts taking requests
+    warm_task = asyncio.create_task(store.warm_cache())
+    _bg_tasks.add(warm_task)
+    warm_task.add_done_callback(_bg_tasks.discard)
     yield
+    # Drain pending background KV writes before the instance is torn down
+    if _bg_tasks:
+        await asyncio.gather(*_bg_tasks, return_exceptions=True)
+    if _preview_http is not None:
+        await _preview_http.aclose()
+    if _scrape_http is not None:
+        _scrape_http.close()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -1964,7 +2397,8 @@ app = FastAPI(
     title="PLC AutoConfig Backend",
     description="Backend for AI-powered PLC software configuration from CSV data",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=_DefaultResponse,
 )
 
 # Request logging middleware
@@ -1973,7 +2407,7 @@ async def log_requests(request: Request, call_next):
     start = _time_module.time()
     response = await call_next(request)
     duration = _time_module.time() - start
-    print(f"[API] {request.method} {request.url.path} → {response.status_code} ({duration:.2f}s)")
+    logger.info("[API] %s %s → %s (%.2fs)", request.method, request.url.path, response.status_code, duration)
     return response
 
 app.add_middleware(
@@ -1985,38 +2419,88 @@ app.add_middleware(
 )
 
 
-# ============================================================================
-# PROJECT ROUTES
-# ============================================================================
+# Admission gates: bound in-flight uploads, preview fetches and AI extractions per worker
+# so bursts queue up instead of exhausting memory, outbound connections and API rate limits
+_UPLOAD_SEM = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+_PREVIEW_SEM = asyncio.Semaphore(MAX_CONCURRENT_PREVIEWS)
+_AI_EXTRACT_SEM = asyncio.Semaphore(MAX_CONCURRENT_AI_EXTRACTIONS)
 
-@app.post("/api/projects", response_model=Project)
-async def create_project(request: CreateProjectRequest):
-    """Create a new project. If an ID is provided and that project already exists, return it."""
-    # Input validation
-    if not request.name or not request.name.strip():
-        raise HTTPException(status_code=400, detail="Project name cannot be empty")
-    if not request.customer_name or not request.customer_name.strip():
-        raise HTTPException(status_code=400, detail="Customer name cannot be empty")
+# Shared async HTTP client for preview fetches (created lazily, closed on shutdown)
+_preview_http: Optional[httpx.AsyncClient] = None
 
-    # Normalize community_url
+
+def _get_preview_http() -> httpx.AsyncClient:
+    """Return the shared preview client, creating it on first use."""
+    global _preview_http
+    if _preview_http is None or _preview_http.is_closed:
+        _preview_http = httpx.AsyncClient(
+            timeout=8,
+            follow_redirects=True,
+            headers={'User-Agent': 'Mozilla/5.0 (compatible; OpenGov-AutoConfig/1.0)'},
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_PREVIEWS),
+        )
+    return _preview_http
+
+
+# Shared sync HTTP client for the crawler, which runs in worker threads; keeps
+# connections to the community site alive across pages and passes
+_scrape_http: Optional[httpx.Client] = None
+_scrape_http_lock = threading.Lock()
+
+
+def _get_scrape_http() -> httpx.Client:
+    """Return the shared crawler client, creating it on first use.
+
+    Crawler threads can get here at the same time, so creation is double-checked
+    under a lock; otherwise each racing thread builds a client and all but one leak.
+    """
+    global _scrape_http
+    client = _scrape_http
+    if client is not None and not client.is_closed:
+        return client
+    with _scrape_http_lock:
+        if _scrape_http is None or _scrape_http.is_closed:
+            _scrape_http = httpx.Client(
+                timeout=10,
+                follow_redirects=True,
+                headers={'User-Agent': 'Mozilla/5.0 (compatible; OpenGov-AutoConfig/1.0)'},
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+            )
+        return _scrape_http
+
+
+# ============================================================================
+# PROJECT ROUTES
+# ============================================================================
+
+@app.post("/api/projects", response_model=Project)
+async def create_project(request: CreateProjectRequest):
+    """Create a new project. If an ID is provided and that project already exists, return it."""
+    # Input validation
+    if not request.name or not request.name.strip():
+        raise HTTPException(status_code=400, detail="Project name cannot be empty")
+    if not request.customer_name or not request.customer_name.strip():
+        raise HTTPException(status_code=400, detail="Customer name cannot be empty")
+
+    # Normalize community_url
     community_url = _normalize_url(request.community_url) if request.community_url else ""
 
     # If ID provided, check if project already exists (cold-start recovery)
     if request.id:
         existing = store.get_project(request.id)
         if existing:
-            print(f"[API] Project {request.id} already exists, returning existing")
+            logger.debug("[API] Project %s already exists, returning existing", request.id)
             return existing
 
     project = Project(
-        id=request.id if request.id else str(uuid.uuid4())[:8],
+        id=request.id if request.id else _short_id(),
         name=request.name.strip(),
         customer_name=request.customer_name.strip(),
         product_type=request.product_type,
         community_url=community_url,
     )
     store.create_project(project)
-    print(f"[API] Created project {project.id} '{project.name}' | KV={KV_AVAILABLE}")
+    logger.info("[API] Created project %s '%s' | KV=%s", project.id, project.name, KV_AVAILABLE)
     return project
 
 
@@ -2024,19 +2508,19 @@ async def create_project(request: CreateProjectRequest):
 async def list_projects():
     """List all projects"""
     projects = store.list_projects()
-    print(f"[API] List projects: {len(projects)} found | KV={KV_AVAILABLE}")
+    logger.debug("[API] List projects: %s found | KV=%s", len(projects), KV_AVAILABLE)
     return projects
 
 
 @app.get("/api/projects/{project_id}", response_model=Project)
 async def get_project(project_id: str):
     """Get a specific project"""
-    print(f"[API] Getting project {project_id} | KV={KV_AVAILABLE} | in_memory={project_id in store._projects}")
-    project = store.get_project(project_id)
+    logger.debug("[API] Getting project %s | KV=%s | in_memory=%s", project_id, KV_AVAILABLE, project_id in store._projects)
+    project = store.get_project_model(project_id)
     if not project:
-        print(f"[API] Project {project_id} NOT FOUND after checking memory/disk/KV")
+        logger.warning("[API] Project %s NOT FOUND after checking memory/disk/KV", project_id)
         raise HTTPException(status_code=404, detail="Project not found")
-    print(f"[API] Project {project_id} found: '{project.name}'")
+    logger.debug("[API] Project %s found: '%s'", project_id, project.name)
     return project
 
 
@@ -2051,86 +2535,151 @@ async def delete_project(project_id: str):
 @app.post("/api/projects/{project_id}/upload")
 async def upload_files(project_id: str, files: List[UploadFile] = File(...)):
     """Upload CSV files to a project"""
-    import time as _time
     # File size limits
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB per file
     MAX_TOTAL_SIZE = 50 * 1024 * 1024  # 50MB total
 
     # Retry project lookup — handles Vercel cold starts where KV needs a moment
-    project = None
-    for attempt in range(3):
-        project = store.get_project(project_id)
-        if project:
-            break
-        print(f"[UPLOAD] Project {project_id} not found on attempt {attempt + 1}/3, retrying...")
-        _time.sleep(0.5)
+    project = await _get_project_with_retry(project_id)
     if not project:
-        print(f"[UPLOAD] Project {project_id} NOT FOUND after 3 attempts | KV={KV_AVAILABLE}")
+        logger.warning("[UPLOAD] Project %s NOT FOUND after retrying | KV=%s", project_id, KV_AVAILABLE)
         raise HTTPException(status_code=404, detail=f"Project not found. KV connected: {KV_AVAILABLE}. Please try refreshing the page.")
 
-    upload_dir = os.path.join(UPLOAD_DIR, project_id)
-    os.makedirs(upload_dir, exist_ok=True)
-
-    uploaded = []
-    total_size = 0
-    for file in files:
-        try:
-            content = await file.read()
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to read file {file.filename}: {str(e)}")
-
-        # Validate file size
-        file_size = len(content)
-        if file_size > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File '{file.filename}' exceeds 10MB limit (size: {file_size / (1024*1024):.1f}MB)"
-            )
-
-        total_size += file_size
-        if total_size > MAX_TOTAL_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Total upload size exceeds 50MB limit (current: {total_size / (1024*1024):.1f}MB)"
-            )
-
-        try:
-            file_path = os.path.join(upload_dir, file.filename)
-            with open(file_path, "wb") as f:
-                f.write(content)
-        except (IOError, OSError) as e:
-            raise HTTPException(status_code=500, detail=f"Failed to save file {file.filename}: {str(e)}")
+    _check_unique_upload_names(f.filename for f in files)
+
+    async with _UPLOAD_SEM:
+        upload_dir = _pathlib.Path(UPLOAD_DIR, project_id)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        upload_dir = upload_dir.resolve()
+
+        total_size = 0
+
+        async def _process_one(file: UploadFile) -> UploadedFile:
+            nonlocal total_size
+            file_path = None
+            filename = file.filename
+            # Stream the upload to disk in chunks, decoding incrementally to validate
+            # UTF-8; only the prefix persisted to KV is kept in memory
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            text_parts = []
+            text_len = 0
+            file_size = 0
+            try:
+                file_path = _safe_upload_path(upload_dir, file.filename)
+                filename = file_path.name
+                async with aiofiles.open(file_path, "wb") as out:
+                    while True:
+                        try:
+                            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                        except Exception as e:
+                            raise HTTPException(status_code=400, detail=f"Failed to read file {filename}: {str(e)}")
+                        if not chunk:
+                            break
 
-        try:
-            csv_text = content.decode("utf-8")
-            metadata = CSVParser.parse(csv_text)
-
-            file_info = UploadedFile(
-                filename=file.filename,
-                size=len(content),
-                rows_count=metadata.get("total_rows", 0),
-                columns=metadata.get("columns", []),
-            )
-            store.add_uploaded_file(project_id, file_info)
-            uploaded.append(file_info)
+                        # Validate file size as bytes arrive (total is shared across files)
+                        file_size += len(chunk)
+                        total_size += len(chunk)
+                        if file_size > MAX_FILE_SIZE:
+                            raise HTTPException(
+                                status_code=413,
+                                detail=f"File '{filename}' exceeds 10MB limit (size: >{file_size / (1024*1024):.1f}MB)"
+                            )
+                        if total_size > MAX_TOTAL_SIZE:
+                            raise HTTPException(
+                                status_code=413,
+                                detail=f"Total upload size exceeds 50MB limit (current: >{total_size / (1024*1024):.1f}MB)"
+                            )
+
+                        await out.write(chunk)
+                        text = decoder.decode(chunk)
+                        if text_len < KV_FILE_CONTENT_CAP:
+                            text_parts.append(text)
+                            text_len += len(text)
+                    decoder.decode(b"", final=True)
+            except BaseException as e:
+                # Never leave a partial file behind for the later pipeline steps to parse
+                if file_path is not None:
+                    _remove_partial_upload(file_path)
+                if isinstance(e, UnicodeDecodeError):
+                    raise HTTPException(status_code=400, detail=f"Failed to parse {filename}: {str(e)}")
+                if isinstance(e, OSError):
+                    raise HTTPException(status_code=500, detail=f"Failed to save file {filename}: {str(e)}")
+                raise
+            finally:
+                # Release the spooled upload as soon as it is consumed or rejected,
+                # rather than holding it until the whole batch finishes
+                await file.close()
 
-            # Store CSV content in KV for persistence across cold starts
-            if KV_AVAILABLE:
-                try:
-                    csv_content = content.decode('utf-8', errors='ignore')
-                    _kv_set(f"file:{project_id}:{file.filename}", {
-                        "filename": file.filename,
-                        "content": csv_content[:500000],  # Cap at 500KB per file
+            try:
+                # Parse row by row from disk; parsing is CPU-bound, so keep it off the event loop
+                metadata = await asyncio.to_thread(CSVParser.parse_file, file_path)
+
+                file_info = UploadedFile(
+                    filename=filename,
+                    size=file_size,
+                    rows_count=metadata.get("total_rows", 0),
+                    columns=metadata.get("columns", []),
+                )
+
+                # Store CSV content in KV for persistence across cold starts
+                # (written in the background so the KV round-trip stays off the response path)
+                if KV_AVAILABLE:
+                    _kv_set_background(f"file:{project_id}:{filename}", {
+                        "filename": filename,
+                        "content": "".join(text_parts)[:KV_FILE_CONTENT_CAP],
                         "metadata": metadata
                     })
-                    print(f"[KV] Stored CSV content for {file.filename} in KV")
-                except Exception as e:
-                    print(f"[KV] Failed to store file content: {e}")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to parse {file.filename}: {str(e)}")
+            except Exception as e:
+                _remove_partial_upload(file_path)
+                raise HTTPException(status_code=400, detail=f"Failed to parse {filename}: {str(e)}")
+            return file_info
 
-    store.update_project(project_id, status="uploading")
-    return {"files": uploaded, "project_status": "uploading"}
+        # Process files concurrently so one file's disk and KV I/O overlaps the next
+        # (names are unique, so no two tasks write the same path)
+        uploaded = _record_uploads(
+            project_id,
+            await asyncio.gather(*(_process_one(f) for f in files), return_exceptions=True),
+        )
+        return {"files": uploaded, "project_status": "uploading"}
+
+
+def _record_uploads(project_id: str, results: list) -> List[UploadedFile]:
+    """Persist the files from an asyncio.gather(return_exceptions=True) upload batch in
+    one store write, then re-raise the first per-file error, if any."""
+    uploaded = [r for r in results if isinstance(r, UploadedFile)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        if uploaded:
+            store.extend_uploaded_files(project_id, uploaded)
+        raise errors[0]
+    store.extend_uploaded_files(project_id, uploaded, status="uploading")
+    return uploaded
+
+
+def _safe_upload_path(base: _pathlib.Path, filename: str) -> _pathlib.Path:
+    """Resolve an uploaded filename inside base, rejecting directory traversal."""
+    name = os.path.basename(filename or "")
+    target = (base / name).resolve()
+    if not name or target.parent != base:
+        raise HTTPException(status_code=400, detail=f"Invalid filename: {filename}")
+    return target
+
+
+def _check_unique_upload_names(filenames) -> None:
+    """Reject a batch that names the same file twice: files are written concurrently,
+    so two parts with one name would interleave into the same path."""
+    counts = Counter(os.path.basename(name or "") for name in filenames)
+    duplicates = sorted(name for name, count in counts.items() if name and count > 1)
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Duplicate filename in upload: {', '.join(duplicates)}")
+
+
+def _remove_partial_upload(file_path: _pathlib.Path) -> None:
+    """Best-effort cleanup of a file whose upload was rejected mid-stream."""
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
 
 
 @app.post("/api/projects/{project_id}/upload-text")
@@ -2138,76 +2687,74 @@ async def upload_csv_text(project_id: str, request: Request):
     """Upload CSV data as text (JSON body) to bypass Vercel's 4.5MB multipart limit.
     Accepts: { files: [{ filename, content }] } where content is the CSV text.
     The frontend reads large files client-side and sends text instead of binary."""
-    import time as _time
-
-    project = None
-    for attempt in range(3):
-        project = store.get_project(project_id)
-        if project:
-            break
-        _time.sleep(0.5)
+    project = await _get_project_with_retry(project_id)
     if not project:
         raise HTTPException(status_code=404, detail=f"Project not found. KV connected: {KV_AVAILABLE}.")
 
     try:
-        body = await request.json()
+        body = _json_loads(await request.body())
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON body")
 
     file_list = body.get("files", [])
     if not file_list:
         raise HTTPException(status_code=400, detail="No files provided")
+    _check_unique_upload_names(fd.get("filename", "unknown.csv") for fd in file_list if fd.get("content"))
 
-    upload_dir = os.path.join(UPLOAD_DIR, project_id)
-    os.makedirs(upload_dir, exist_ok=True)
-
-    uploaded = []
-    for file_data in file_list:
-        filename = file_data.get("filename", "unknown.csv")
-        csv_text = file_data.get("content", "")
-        if not csv_text:
-            continue
-
-        # Cap at 3MB of text per file to stay within Vercel limits
-        if len(csv_text) > 3 * 1024 * 1024:
-            csv_text = csv_text[:3 * 1024 * 1024]
-            # Trim to last complete line
-            last_newline = csv_text.rfind("\n")
-            if last_newline > 0:
-                csv_text = csv_text[:last_newline]
+    async with _UPLOAD_SEM:
+        upload_dir = _pathlib.Path(UPLOAD_DIR, project_id)
+        upload_dir.mkdir(parents=True, exist_ok=True)
+        upload_dir = upload_dir.resolve()
 
-        try:
-            file_path = os.path.join(upload_dir, filename)
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(csv_text)
-        except (IOError, OSError) as e:
-            raise HTTPException(status_code=500, detail=f"Failed to save file {filename}: {str(e)}")
-
-        try:
-            metadata = CSVParser.parse(csv_text)
-            file_info = UploadedFile(
-                filename=filename,
-                size=len(csv_text.encode("utf-8")),
-                rows_count=metadata.get("total_rows", 0),
-                columns=metadata.get("columns", []),
-            )
-            store.add_uploaded_file(project_id, file_info)
-            uploaded.append(file_info)
+        async def _process_one(file_data: dict) -> Optional[UploadedFile]:
+            csv_text = file_data.get("content", "")
+            if not csv_text:
+                return None
+            file_path = _safe_upload_path(upload_dir, file_data.get("filename", "unknown.csv"))
+            filename = file_path.name
+
+            # Cap at 3MB of text per file to stay within Vercel limits
+            if len(csv_text) > 3 * 1024 * 1024:
+                csv_text = csv_text[:3 * 1024 * 1024]
+                # Trim to last complete line
+                last_newline = csv_text.rfind("\n")
+                if last_newline > 0:
+                    csv_text = csv_text[:last_newline]
+
+            # Encode once: the same bytes are written to disk and give the file size
+            csv_bytes = csv_text.encode("utf-8")
+            try:
+                async with aiofiles.open(file_path, "wb") as f:
+                    await f.write(csv_bytes)
+            except (IOError, OSError) as e:
+                _remove_partial_upload(file_path)
+                raise HTTPException(status_code=500, detail=f"Failed to save file {filename}: {str(e)}")
 
-            if KV_AVAILABLE:
-                try:
-                    _kv_set(f"file:{project_id}:{filename}", {
+            try:
+                metadata = await asyncio.to_thread(CSVParser.parse, csv_text)
+                file_info = UploadedFile(
+                    filename=filename,
+                    size=len(csv_bytes),
+                    rows_count=metadata.get("total_rows", 0),
+                    columns=metadata.get("columns", []),
+                )
+
+                if KV_AVAILABLE:
+                    _kv_set_background(f"file:{project_id}:{filename}", {
                         "filename": filename,
-                        "content": csv_text[:500000],
+                        "content": csv_text[:KV_FILE_CONTENT_CAP],
                         "metadata": metadata
                     })
-                except Exception as e:
-                    print(f"[KV] Failed to store file content: {e}")
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Failed to parse {filename}: {str(e)}")
+            except Exception as e:
+                _remove_partial_upload(file_path)
+                raise HTTPException(status_code=400, detail=f"Failed to parse {filename}: {str(e)}")
+            return file_info
 
-    store.update_project(project_id, status="uploading")
-    return {"files": uploaded, "project_status": "uploading"}
+        uploaded = _record_uploads(
+            project_id,
+            await asyncio.gather(*(_process_one(fd) for fd in file_list), return_exceptions=True),
+        )
+        return {"files": uploaded, "project_status": "uploading"}
 
 
 
@@ -2216,59 +2763,106 @@ async def upload_csv_text(project_id: str, request: Request):
 # INTELLIGENCE PIPELINE HELPERS
 # ============================================================================
 
+_PEER_KEYWORDS = {
+    "permit": ["building", "construction", "residential", "commercial", "demolition", "grading", "electrical", "plumbing", "mechanical"],
+    "license": ["business", "license", "vendor", "alcohol", "food", "contractor"],
+    "enforcement": ["code", "enforcement", "violation", "complaint", "nuisance"],
+    "land": ["subdivision", "zoning", "variance", "conditional use", "land use", "planning"],
+}
+_PEER_KEYWORD_RE = re.compile("|".join(
+    f"(?P<{group}>{'|'.join(re.escape(k) for k in keywords)})"
+    for group, keywords in _PEER_KEYWORDS.items()
+))
+
+
 def _match_peer_template(csv_summary: str, community_name: str) -> dict:
     """Auto-match the best peer city template based on CSV data analysis."""
     csv_lower = csv_summary.lower()
 
-    permit_keywords = ["building", "construction", "residential", "commercial", "demolition", "grading", "electrical", "plumbing", "mechanical"]
-    license_keywords = ["business", "license", "vendor", "alcohol", "food", "contractor"]
-    enforcement_keywords = ["code", "enforcement", "violation", "complaint", "nuisance"]
-    land_keywords = ["subdivision", "zoning", "variance", "conditional use", "land use", "planning"]
+    # Distinct keywords seen per category, found in a single regex pass
+    found = {"permit": set(), "license": set(), "enforcement": set(), "land": set()}
+    for m in _PEER_KEYWORD_RE.finditer(csv_lower):
+        found[m.lastgroup].add(m.group())
 
-    permit_count = sum(1 for k in permit_keywords if k in csv_lower)
-    license_count = sum(1 for k in license_keywords if k in csv_lower)
-    enforcement_count = sum(1 for k in enforcement_keywords if k in csv_lower)
-    land_count = sum(1 for k in land_keywords if k in csv_lower)
+    permit_count = len(found["permit"])
+    license_count = len(found["license"])
+    enforcement_count = len(found["enforcement"])
+    land_count = len(found["land"])
 
     total_complexity = permit_count + license_count + enforcement_count + land_count
 
     if land_count >= 2:
-        return next((t for t in PEER_CITY_TEMPLATES if t["id"] == "county-planning"), PEER_CITY_TEMPLATES[1])
+        return _PEER_BY_ID.get("county-planning", PEER_CITY_TEMPLATES[1])
     elif total_complexity >= 6:
-        return next((t for t in PEER_CITY_TEMPLATES if t["id"] == "mid-city-full"), PEER_CITY_TEMPLATES[1])
+        return _PEER_BY_ID.get("mid-city-full", PEER_CITY_TEMPLATES[1])
     else:
-        return next((t for t in PEER_CITY_TEMPLATES if t["id"] == "small-town-basic"), PEER_CITY_TEMPLATES[0])
+        return _PEER_BY_ID.get("small-town-basic", PEER_CITY_TEMPLATES[0])
 
 
-def _build_intelligence_context(csv_summary: str, community_context: str, matched_template: dict) -> str:
-    """Build comprehensive intelligence context for AI analysis."""
-    template_context = f"""
+def _build_intelligence_context(matched_template: dict) -> str:
+    """Build the peer city template context for AI analysis."""
+    parts = [f"""
 ## Matched Peer City Template: {matched_template['name']}
 Description: {matched_template['description']}
 Population Range: {matched_template['population']}
 
 ### Template Record Types:
-"""
+"""]
     for rt in matched_template.get("record_types", []):
-        template_context += f"\n- **{rt['name']}** ({rt.get('category', 'General')})"
+        parts.append(f"\n- **{rt['name']}** ({rt.get('category', 'General')})")
         if rt.get("fees"):
-            template_context += f"\n  Fees: {', '.join(f['name'] + ' $' + str(f['amount']) for f in rt['fees'])}"
+            parts.append(f"\n  Fees: {', '.join(f['name'] + ' $' + str(f['amount']) for f in rt['fees'])}")
         if rt.get("workflow_steps"):
-            template_context += f"\n  Workflow: {' → '.join(s['name'] for s in rt['workflow_steps'])}"
+            parts.append(f"\n  Workflow: {' → '.join(s['name'] for s in rt['workflow_steps'])}")
         if rt.get("form_fields"):
-            template_context += f"\n  Fields: {len(rt['form_fields'])} fields including {', '.join(f['name'] for f in rt['form_fields'][:5])}"
+            parts.append(f"\n  Fields: {len(rt['form_fields'])} fields including {', '.join(f['name'] for f in rt['form_fields'][:5])}")
         if rt.get("required_documents"):
-            template_context += f"\n  Documents: {', '.join(d['name'] for d in rt['required_documents'])}"
+            parts.append(f"\n  Documents: {', '.join(d['name'] for d in rt['required_documents'])}")
 
-    template_context += f"\n\n### Template Departments:\n"
+    parts.append("\n\n### Template Departments:\n")
     for dept in matched_template.get("departments", []):
-        template_context += f"- {dept['name']}: {dept.get('description', '')}\n"
+        parts.append(f"- {dept['name']}: {dept.get('description', '')}\n")
 
-    template_context += f"\n### Template User Roles:\n"
+    parts.append("\n### Template User Roles:\n")
     for role in matched_template.get("roles", []):
-        template_context += f"- {role['name']}: {role.get('description', '')}\n"
+        parts.append(f"- {role['name']}: {role.get('description', '')}\n")
+
+    return "".join(parts)
+
+
+# Bounded memo caches (see _cache_put)
+_CONFIG_CACHE_MAX = 128
+# Step 4 prompt fragments, keyed on a hash of the research blob / the peer template id
+_research_context_cache: Dict[bytes, str] = {}
+_template_context_cache: Dict[bytes, str] = {}
+# Serialized intelligence endpoint bodies, keyed on a hash of the stored report string
+_intelligence_response_cache: Dict[bytes, bytes] = {}
+
+
+def _cache_put(cache: dict, key: Optional[bytes], value: Any) -> None:
+    """Store a value in a bounded cache, evicting the oldest entry when full."""
+    if key is None:
+        return
+    if len(cache) >= _CONFIG_CACHE_MAX:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def _cached_research_context(research: dict) -> str:
+    """_format_research_for_analysis, memoized on a content hash of the research."""
+    key = hashlib.blake2b(_json_dumps(research).encode(), digest_size=16).digest()
+    if key not in _research_context_cache:
+        _cache_put(_research_context_cache, key, _format_research_for_analysis(research))
+    return _research_context_cache[key]
+
 
-    return template_context
+def _cached_template_context(matched_template: dict) -> str:
+    """_build_intelligence_context, memoized per peer template; the context is
+    built from the template alone, so it is the same for every project matching it."""
+    key = str(matched_template.get("id", "")).encode()
+    if key not in _template_context_cache:
+        _cache_put(_template_context_cache, key, _build_intelligence_context(matched_template))
+    return _template_context_cache[key]
 
 
 def _compute_agent_stats(configuration) -> dict:
@@ -2318,6 +2912,65 @@ def _compute_agent_stats(configuration) -> dict:
     return stats
 
 
+def _summarize_configuration(configuration) -> dict:
+    """Score and summarize a configuration for the intelligence report."""
+    summary = {}
+    rt_count = len(configuration.record_types) if hasattr(configuration, 'record_types') else 0
+    dept_count = len(configuration.departments) if hasattr(configuration, 'departments') else 0
+    role_count = len(configuration.user_roles) if hasattr(configuration, 'user_roles') else 0
+
+    score = 0
+    if rt_count >= 3: score += 25
+    elif rt_count >= 1: score += 15
+    if dept_count >= 2: score += 20
+    elif dept_count >= 1: score += 10
+    if role_count >= 3: score += 15
+    elif role_count >= 1: score += 8
+
+    # Fee totals and content flags in a single pass over the record types
+    total_fees = 0
+    has_fees = has_workflows = has_docs = has_fields = False
+    for rt in getattr(configuration, 'record_types', None) or ():
+        fee_count = len(rt.fees)
+        total_fees += fee_count
+        has_fees = has_fees or fee_count > 0
+        has_workflows = has_workflows or len(rt.workflow_steps) > 0
+        has_docs = has_docs or len(rt.required_documents) > 0
+        has_fields = has_fields or len(rt.form_fields) > 0
+
+    if has_fees: score += 10
+    if has_workflows: score += 10
+    if has_docs: score += 10
+    if has_fields: score += 10
+
+    summary["completeness_score"] = min(score, 100)
+
+    summary["config_overview"] = {
+        "record_types_count": rt_count,
+        "departments_count": dept_count,
+        "user_roles_count": role_count,
+        "total_fees": total_fees,
+        "has_workflows": has_workflows,
+        "has_documents": has_docs,
+        "has_form_fields": has_fields,
+    }
+
+    summary["auto_enhancements"] = []
+    if has_fees:
+        summary["auto_enhancements"].append({"title": "Fee Structures Generated", "description": f"{total_fees} fee items created across all record types based on industry standards"})
+    if has_workflows:
+        summary["auto_enhancements"].append({"title": "Workflow Steps Configured", "description": "Complete approval workflows generated for each record type"})
+    if has_docs:
+        summary["auto_enhancements"].append({"title": "Required Documents Defined", "description": "Document checklists created for each permit/license type"})
+    if has_fields:
+        summary["auto_enhancements"].append({"title": "Form Fields Built", "description": "Application forms designed with all necessary fields for each record type"})
+    if dept_count >= 2:
+        summary["auto_enhancements"].append({"title": "Department Structure", "description": f"{dept_count} departments configured with appropriate assignments"})
+
+    summary["analysis_summary"] = f"Generated {rt_count} record types, {dept_count} departments, and {role_count} user roles with {total_fees} fee items. Configuration includes {'fees, ' if has_fees else ''}{'workflows, ' if has_workflows else ''}{'documents, ' if has_docs else ''}{'form fields' if has_fields else ''}."
+    return summary
+
+
 def _build_intelligence_report(csv_summary: str, community_context: str, matched_template: dict, configuration) -> dict:
     """Generate an intelligence report summarizing what was analyzed and used."""
     report = {
@@ -2366,56 +3019,7 @@ def _build_intelligence_report(csv_summary: str, community_context: str, matched
     })
 
     if configuration:
-        rt_count = len(configuration.record_types) if hasattr(configuration, 'record_types') else 0
-        dept_count = len(configuration.departments) if hasattr(configuration, 'departments') else 0
-        role_count = len(configuration.user_roles) if hasattr(configuration, 'user_roles') else 0
-
-        score = 0
-        if rt_count >= 3: score += 25
-        elif rt_count >= 1: score += 15
-        if dept_count >= 2: score += 20
-        elif dept_count >= 1: score += 10
-        if role_count >= 3: score += 15
-        elif role_count >= 1: score += 8
-
-        has_fees = any(len(rt.fees) > 0 for rt in configuration.record_types) if hasattr(configuration, 'record_types') else False
-        has_workflows = any(len(rt.workflow_steps) > 0 for rt in configuration.record_types) if hasattr(configuration, 'record_types') else False
-        has_docs = any(len(rt.required_documents) > 0 for rt in configuration.record_types) if hasattr(configuration, 'record_types') else False
-        has_fields = any(len(rt.form_fields) > 0 for rt in configuration.record_types) if hasattr(configuration, 'record_types') else False
-
-        if has_fees: score += 10
-        if has_workflows: score += 10
-        if has_docs: score += 10
-        if has_fields: score += 10
-
-        report["completeness_score"] = min(score, 100)
-
-        # Count total fees across all record types
-        total_fees = sum(len(rt.fees) for rt in configuration.record_types) if hasattr(configuration, 'record_types') else 0
-
-        report["config_overview"] = {
-            "record_types_count": rt_count,
-            "departments_count": dept_count,
-            "user_roles_count": role_count,
-            "total_fees": total_fees,
-            "has_workflows": has_workflows,
-            "has_documents": has_docs,
-            "has_form_fields": has_fields,
-        }
-
-        report["auto_enhancements"] = []
-        if has_fees:
-            report["auto_enhancements"].append({"title": "Fee Structures Generated", "description": f"{total_fees} fee items created across all record types based on industry standards"})
-        if has_workflows:
-            report["auto_enhancements"].append({"title": "Workflow Steps Configured", "description": "Complete approval workflows generated for each record type"})
-        if has_docs:
-            report["auto_enhancements"].append({"title": "Required Documents Defined", "description": "Document checklists created for each permit/license type"})
-        if has_fields:
-            report["auto_enhancements"].append({"title": "Form Fields Built", "description": "Application forms designed with all necessary fields for each record type"})
-        if dept_count >= 2:
-            report["auto_enhancements"].append({"title": "Department Structure", "description": f"{dept_count} departments configured with appropriate assignments"})
-
-        report["analysis_summary"] = f"Generated {rt_count} record types, {dept_count} departments, and {role_count} user roles with {total_fees} fee items. Configuration includes {'fees, ' if has_fees else ''}{'workflows, ' if has_workflows else ''}{'documents, ' if has_docs else ''}{'form fields' if has_fields else ''}."
+        report.update(_summarize_configuration(configuration))
 
     report["agent_stats"] = _compute_agent_stats(configuration)
     report["ai_mode"] = claude_service.last_mode  # "ai" or "mock"
@@ -2427,6 +3031,78 @@ def _build_intelligence_report(csv_summary: str, community_context: str, matched
 # CITY PREVIEW
 # ================================================================
 
+class _MetaExtractor(HTMLParser):
+    """Stdlib fallback for _extract_page_meta when selectolax is not installed."""
+
+    def __init__(self):
+        super().__init__()
+        self.title = ""
+        self._in_title = False
+        self.description = ""
+        self.og_image = ""
+        self.favicon = ""
+
+    def handle_starttag(self, tag, attrs):
+        attrs_dict = dict(attrs)
+        if tag == 'title':
+            self._in_title = True
+        if tag == 'meta':
+            name = attrs_dict.get('name', '').lower()
+            prop = attrs_dict.get('property', '').lower()
+            content = attrs_dict.get('content', '')
+            if name == 'description' or prop == 'og:description':
+                self.description = self.description or content
+            if prop == 'og:image':
+                self.og_image = content
+        if tag == 'link':
+            rel = attrs_dict.get('rel', '').lower()
+            if 'icon' in rel:
+                href = attrs_dict.get('href', '')
+                if href:
+                    self.favicon = href
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data.strip()
+
+
+def _extract_page_meta(html: str) -> dict:
+    """Pull title, description, og:image and favicon out of a page's HTML."""
+    if not SELECTOLAX_AVAILABLE:
+        parser = _MetaExtractor()
+        parser.feed(html)
+        return {"title": parser.title, "description": parser.description,
+                "og_image": parser.og_image, "favicon": parser.favicon}
+
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first('title')
+    meta = {
+        "title": title_node.text(strip=True) if title_node else "",
+        "description": "",
+        "og_image": "",
+        "favicon": "",
+    }
+    for node in tree.css('meta, link'):
+        attrs = node.attributes
+        if node.tag == 'meta':
+            name = (attrs.get('name') or '').lower()
+            prop = (attrs.get('property') or '').lower()
+            content = attrs.get('content') or ''
+            if name == 'description' or prop == 'og:description':
+                meta["description"] = meta["description"] or content
+            if prop == 'og:image':
+                meta["og_image"] = content
+        elif 'icon' in (attrs.get('rel') or '').lower():
+            href = attrs.get('href') or ''
+            if href:
+                meta["favicon"] = href
+    return meta
+
+
 @app.post("/api/city-preview")
 async def city_preview(data: dict = {}):
     """Quick preview of a city website — extracts title, description, favicon."""
@@ -2436,80 +3112,116 @@ async def city_preview(data: dict = {}):
     if not url.startswith("http"):
         url = f"https://{url}"
 
-    try:
-        import urllib.request
-        import urllib.parse
-        from html.parser import HTMLParser
-
-        class MetaExtractor(HTMLParser):
-            def __init__(self):
-                super().__init__()
-                self.title = ""
-                self._in_title = False
-                self.description = ""
-                self.og_image = ""
-                self.favicon = ""
-
-            def handle_starttag(self, tag, attrs):
-                attrs_dict = dict(attrs)
-                if tag == 'title':
-                    self._in_title = True
-                if tag == 'meta':
-                    name = attrs_dict.get('name', '').lower()
-                    prop = attrs_dict.get('property', '').lower()
-                    content = attrs_dict.get('content', '')
-                    if name == 'description' or prop == 'og:description':
-                        self.description = self.description or content
-                    if prop == 'og:image':
-                        self.og_image = content
-                if tag == 'link':
-                    rel = attrs_dict.get('rel', '').lower()
-                    if 'icon' in rel:
-                        href = attrs_dict.get('href', '')
-                        if href:
-                            self.favicon = href
-
-            def handle_endtag(self, tag):
-                if tag == 'title':
-                    self._in_title = False
-
-            def handle_data(self, data):
-                if self._in_title:
-                    self.title += data.strip()
-
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 (compatible; OpenGov-AutoConfig/1.0)'})
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            html = resp.read(50000).decode('utf-8', errors='ignore')
-
-        parser = MetaExtractor()
-        parser.feed(html)
+    async with _PREVIEW_SEM:
+        try:
+            import urllib.parse
+            # Stream only the first 50KB — the <head> metadata lives there
+            body = bytearray()
+            async with _get_preview_http().stream("GET", url) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    body += chunk
+                    if len(body) >= 50000:
+                        break
+            html = body[:50000].decode('utf-8', errors='ignore')
 
-        parsed = urllib.parse.urlparse(url)
-        city_name = parser.title.split('|')[0].split('-')[0].strip() if parser.title else parsed.netloc
+            meta = _extract_page_meta(html)
 
-        # Resolve relative favicon URL
-        favicon = parser.favicon
-        if favicon and not favicon.startswith('http'):
-            favicon = urllib.parse.urljoin(url, favicon)
+            parsed = urllib.parse.urlparse(url)
+            city_name = meta["title"].split('|')[0].split('-')[0].strip() if meta["title"] else parsed.netloc
 
-        return {
-            "city_name": _sanitize_to_ascii(city_name),
-            "description": _sanitize_to_ascii(parser.description[:200]) if parser.description else "",
-            "url": url,
-            "favicon": favicon,
-            "og_image": parser.og_image,
-        }
-    except Exception as e:
-        raise HTTPException(status_code=422, detail=f"Could not fetch city details: {str(e)}")
+            # Resolve relative favicon URL
+            favicon = meta["favicon"]
+            if favicon and not favicon.startswith('http'):
+                favicon = urllib.parse.urljoin(url, favicon)
+
+            return {
+                "city_name": _sanitize_to_ascii(city_name),
+                "description": _sanitize_to_ascii(meta["description"][:200]) if meta["description"] else "",
+                "url": url,
+                "favicon": favicon,
+                "og_image": meta["og_image"],
+            }
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Could not fetch city details: {str(e)}")
 
 
 # ================================================================
 # STEP-BASED ANALYSIS ENDPOINTS (New)
 # ================================================================
 
+def _file_content_hash(file_path: str) -> str:
+    """blake2b hex digest of a file's bytes, read in CSV_READ_BLOCK_SIZE blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(CSV_READ_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _parse_csv_file_cached(file_path: str) -> dict:
+    """CSVParser.parse_file, cached in KV by content hash so unchanged files
+    are not re-parsed when analysis is run again (or in another project)"""
+    if not KV_AVAILABLE:
+        return CSVParser.parse_file(file_path)
+    cache_key = f"csv_parse:{_file_content_hash(file_path)}"
+    metadata = _kv_get(cache_key)
+    if metadata:
+        return metadata
+    metadata = CSVParser.parse_file(file_path)
+    _kv_set(cache_key, metadata, ex=CSV_PARSE_CACHE_TTL)
+    return metadata
+
+
+def _parse_uploaded_csv(file_path: str, filename: str) -> Optional[tuple]:
+    """Parse one uploaded CSV (sync, run in a worker thread).
+
+    Returns:
+        (summary fragment for the AI prompt, detail dict for the activity stream),
+        or None if the file is missing on this instance
+    """
+    if not os.path.exists(file_path):
+        return None
+    metadata = _parse_csv_file_cached(file_path)
+    summary_fragment = f"\n--- File: {filename} ---\n" + CSVParser.to_summary_string(metadata)
+
+    # Build rich detail for activity stream
+    columns = metadata.get("columns", [])
+    sample_values = {}
+    for col_name, col_info in metadata.get("column_analysis", {}).items():
+        sample_values[col_name] = col_info.get("sample_values", [])[:5]
+
+    detail = {
+        "filename": filename,
+        "rows": metadata.get("total_rows", 0),
+        "columns": columns,
+        "column_count": len(columns),
+        "sample_values": sample_values,
+        "data_quality": "good" if metadata.get("total_rows", 0) > 10 else "limited",
+    }
+    return summary_fragment, detail
+
+
+def _join_csv_summaries(results: list) -> str:
+    """Join per-file CSV summaries, stopping once CSV_DATA_CAP characters are reached."""
+    parts = []
+    remaining = CSV_DATA_CAP
+    for result in results:
+        if not result or remaining <= 0:
+            continue
+        fragment = result[0][:remaining]
+        parts.append(fragment)
+        remaining -= len(fragment)
+    return "".join(parts)
+
+
 @app.post("/api/projects/{project_id}/analyze/parse-csv")
 async def analyze_step1_parse_csv(project_id: str):
     """Step 1: Parse uploaded CSV files and return detailed metadata"""
+    return await _run_step1_parse_csv(project_id)
+
+
+async def _run_step1_parse_csv(project_id: str) -> dict:
     project = store.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -2519,58 +3231,114 @@ async def analyze_step1_parse_csv(project_id: str):
     store.update_project(project_id, status="analyzing", analysis_progress=5, analysis_stage="Parsing CSV files...")
 
     upload_dir = os.path.join(UPLOAD_DIR, project_id)
-    all_csv_data = ""
-    files_detail = []
 
-    for f in project.uploaded_files:
-        file_path = os.path.join(upload_dir, f.filename)
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
-                content = fp.read()
-                metadata = CSVParser.parse(content)
-                summary = CSVParser.to_summary_string(metadata)
-                all_csv_data += f"\n--- File: {f.filename} ---\n" + summary
-
-                # Build rich detail for activity stream
-                columns = metadata.get("columns", [])
-                sample_values = {}
-                for col_name, col_info in metadata.get("column_analysis", {}).items():
-                    sample_values[col_name] = col_info.get("sample_values", [])[:5]
-
-                files_detail.append({
-                    "filename": f.filename,
-                    "rows": metadata.get("total_rows", 0),
-                    "columns": columns,
-                    "column_count": len(columns),
-                    "sample_values": sample_values,
-                    "data_quality": "good" if metadata.get("total_rows", 0) > 10 else "limited",
-                })
+    # Parse every file in worker threads so large CSVs don't block the event loop
+    results = await asyncio.gather(*(
+        asyncio.to_thread(_parse_uploaded_csv, os.path.join(upload_dir, f.filename), f.filename)
+        for f in project.uploaded_files
+    ))
+    files_detail = []
+    total_rows = total_columns = 0
+    all_columns = {}  # dict as an ordered set: first-seen column order is kept for display
+    for result in results:
+        if result:
+            detail = result[1]
+            files_detail.append(detail)
+            total_rows += detail["rows"]
+            total_columns += detail["column_count"]
+            all_columns.update(dict.fromkeys(detail["columns"]))
+    all_csv_data = _join_csv_summaries(results)
 
     # Store the CSV summary on the project for later steps
     store.update_project(project_id, analysis_progress=15, analysis_stage="CSV parsing complete")
 
     # Also stash CSV data for step 4 to use
-    _kv_set(f"csv_data:{project_id}", all_csv_data[:50000])
+    csv_ref = f"csv_data:{project_id}"
+    persisted = _kv_set(csv_ref, all_csv_data)
 
-    return {
+    result = {
         "status": "step_1_complete",
         "activity": {
             "title": "Parsed CSV Files",
-            "description": f"Analyzed {len(files_detail)} files with {sum(f['rows'] for f in files_detail):,} total records",
+            "description": f"Analyzed {len(files_detail)} files with {total_rows:,} total records",
             "details": {
                 "files": files_detail,
-                "total_rows": sum(f["rows"] for f in files_detail),
-                "total_columns": sum(f["column_count"] for f in files_detail),
-                "all_columns": list(set(col for f in files_detail for col in f["columns"])),
+                "total_rows": total_rows,
+                "total_columns": total_columns,
+                "all_columns": list(all_columns),
             }
         },
-        "csv_data": all_csv_data
+        # The deployed bundle (api/static/assets) still posts csv_data back to step 4,
+        # so it stays inline until the frontend is rebuilt to rely on csv_ref alone
+        "csv_data": all_csv_data,
     }
+    # Once the summary is in KV, step 4 can read it from there
+    if persisted:
+        result["csv_ref"] = csv_ref
+    return result
+
+
+PERMIT_KEYWORDS = ["building permit", "electrical permit", "plumbing permit", "mechanical permit",
+                   "demolition permit", "grading permit", "sign permit", "business license",
+                   "conditional use", "variance", "encroachment"]
+DEPT_KEYWORDS = ["planning", "building", "public works", "engineering", "fire", "code enforcement",
+                 "community development", "finance", "city clerk"]
+
+# Fallback matchers: one alternation per category (longest first), so each category is a
+# single regex pass; categories stay separate because "building permit" contains "building"
+_PERMIT_KEYWORD_RE = re.compile("|".join(map(re.escape, sorted(PERMIT_KEYWORDS, key=len, reverse=True))))
+_DEPT_KEYWORD_RE = re.compile("|".join(map(re.escape, sorted(DEPT_KEYWORDS, key=len, reverse=True))))
+
+if AHOCORASICK_AVAILABLE:
+    _KEYWORD_AC = ahocorasick.Automaton()
+    for _kw in PERMIT_KEYWORDS:
+        _KEYWORD_AC.add_word(_kw, ("permit", _kw))
+    for _kw in DEPT_KEYWORDS:
+        _KEYWORD_AC.add_word(_kw, ("dept", _kw))
+    _KEYWORD_AC.make_automaton()
+
+
+def _scan_highlight_keywords(text: str) -> Dict[str, set]:
+    """Find which permit/department keywords occur in lowercased text, in one pass when possible."""
+    hits = {"permit": set(), "dept": set()}
+    if AHOCORASICK_AVAILABLE:
+        for _, (category, kw) in _KEYWORD_AC.iter(text):
+            hits[category].add(kw)
+    else:
+        hits["permit"] = set(_PERMIT_KEYWORD_RE.findall(text))
+        hits["dept"] = set(_DEPT_KEYWORD_RE.findall(text))
+    return hits
+
+
+def _find_terms(terms: List[str], text: str) -> set:
+    """Return the subset of lowercased terms that occur in lowercased text, in one pass when possible."""
+    if not text:
+        return set()
+    terms = [t for t in set(terms) if t]
+    if not AHOCORASICK_AVAILABLE:
+        return {t for t in terms if t in text}
+    automaton = ahocorasick.Automaton()
+    for term in terms:
+        automaton.add_word(term, term)
+    if not len(automaton):
+        return set()
+    automaton.make_automaton()
+    return {term for _, term in automaton.iter(text)}
 
 
 @app.post("/api/projects/{project_id}/analyze/scrape-website")
 async def analyze_step2_scrape_website(project_id: str, request: Request):
     """Step 2: Scrape community website and return detailed findings"""
+    # Parse request body for continuation data
+    body = {}
+    try:
+        body = _json_loads(await request.body())
+    except (json.JSONDecodeError, ValueError):
+        pass
+    return await _run_step2_scrape_website(project_id, body)
+
+
+async def _run_step2_scrape_website(project_id: str, body: dict) -> dict:
     project = store.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -2591,25 +3359,27 @@ async def analyze_step2_scrape_website(project_id: str, request: Request):
 
     store.update_project(project_id, analysis_progress=20, analysis_stage="Scraping community website...")
 
-    # Parse request body for continuation data
-    body = {}
-    try:
-        body = await request.json()
-    except (json.JSONDecodeError, ValueError):
-        pass
     continuation = body.get("continuation")
 
     # Check cache first
-    cached_scrape = _kv_get(f"scrape:{project_id}")
+    scrape_ref = f"scrape:{project_id}"
+    cached_scrape = _kv_get(scrape_ref)
     if cached_scrape and cached_scrape.get("pages_scraped", 0) >= 3 and not continuation:
         scraped_data = cached_scrape
+        persisted = True
     else:
         try:
-            scraped_data = scrape_community_website(url, max_pages=30, continuation=continuation)
+            # Crawl in a worker thread so it can overlap CSV parsing in run-all
+            scraped_data = await asyncio.to_thread(scrape_community_website, url, max_pages=30, continuation=continuation)
             scraped_data["base_url"] = url
-            _kv_set(f"scrape:{project_id}", scraped_data)
+            # Lower and scan the combined text once here; warm cache hits reuse the stored hits
+            scraped_data["keyword_hits"] = {
+                category: sorted(kws)
+                for category, kws in _scan_highlight_keywords(scraped_data.get("combined_text", "").lower()).items()
+            }
+            persisted = _kv_set(scrape_ref, scraped_data)
         except Exception as e:
-            print(f"[ERROR] Scraping failed for {url}: {e}")
+            logger.error("[ERROR] Scraping failed for %s: %s", url, e)
             import traceback
             traceback.print_exc()
             # Return a meaningful error instead of crashing
@@ -2628,19 +3398,13 @@ async def analyze_step2_scrape_website(project_id: str, request: Request):
     top_pages = sorted(pages, key=lambda p: p.get("relevance", 0), reverse=True)[:15]
 
     # Extract quick-scan highlights from page text
-    all_text = scraped_data.get("combined_text", "").lower()
-    permit_keywords = ["building permit", "electrical permit", "plumbing permit", "mechanical permit",
-                       "demolition permit", "grading permit", "sign permit", "business license",
-                       "conditional use", "variance", "encroachment"]
-    permits_mentioned = [kw.title() for kw in permit_keywords if kw in all_text]
-
-    dept_keywords = ["planning", "building", "public works", "engineering", "fire", "code enforcement",
-                     "community development", "finance", "city clerk"]
-    depts_mentioned = [kw.title() for kw in dept_keywords if kw in all_text]
+    hits = scraped_data.get("keyword_hits") or _scan_highlight_keywords(scraped_data.get("combined_text", "").lower())
+    permits_mentioned = [kw.title() for kw in PERMIT_KEYWORDS if kw in hits["permit"]]
+    depts_mentioned = [kw.title() for kw in DEPT_KEYWORDS if kw in hits["dept"]]
 
     store.update_project(project_id, analysis_progress=30, analysis_stage=f"Scraped {len(pages)} pages")
 
-    return {
+    result = {
         "status": "step_2_complete",
         "activity": {
             "title": "Scraped Community Website",
@@ -2657,14 +3421,28 @@ async def analyze_step2_scrape_website(project_id: str, request: Request):
                 "departments_mentioned": depts_mentioned,
             }
         },
+        # Inline for the deployed bundle, like csv_data in step 1
         "scrape_data": scraped_data,
         "continuation": scraped_data.get("continuation")
     }
+    # Steps 3 and 4 can read the scrape from KV when it was persisted
+    if persisted:
+        result["scrape_ref"] = scrape_ref
+    return result
 
 
 @app.post("/api/projects/{project_id}/analyze/extract-data")
 async def analyze_step3_extract_data(project_id: str, request: Request):
     """Step 3: AI-extract structured permits/fees/departments from scraped content"""
+    body = {}
+    try:
+        body = _json_loads(await request.body())
+    except (json.JSONDecodeError, ValueError):
+        pass
+    return await _run_step3_extract_data(project_id, body)
+
+
+async def _run_step3_extract_data(project_id: str, body: dict) -> dict:
     project = store.get_project(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -2672,11 +3450,6 @@ async def analyze_step3_extract_data(project_id: str, request: Request):
     store.update_project(project_id, analysis_progress=40, analysis_stage="AI extracting permits & processes...")
 
     # Try request body first (frontend passes data directly), then fall back to KV cache
-    body = {}
-    try:
-        body = await request.json()
-    except (json.JSONDecodeError, ValueError):
-        pass
     scraped_data = body.get("scrape_data") or _kv_get(f"scrape:{project_id}")
 
     if not scraped_data or scraped_data.get("pages_scraped", 0) < 1:
@@ -2715,7 +3488,7 @@ async def analyze_step3_extract_data(project_id: str, request: Request):
         store.update_project(
             project_id,
             community_name=research.get("community_name", project.customer_name),
-            community_research=json.dumps(research),
+            community_research=_json_dumps(research),
             analysis_progress=50,
             analysis_stage="Data extraction complete"
         )
@@ -2746,30 +3519,40 @@ async def analyze_step3_extract_data(project_id: str, request: Request):
 @app.post("/api/projects/{project_id}/analyze/generate-config")
 async def analyze_step4_generate_config(project_id: str, request: Request):
     """Step 4: AI-generate full PLC configuration from all data sources"""
-    project = store.get_project(project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    store.update_project(project_id, analysis_progress=55, analysis_stage="AI generating record types & workflows...")
-
     # Try request body first (frontend passes data directly)
     body = {}
     try:
-        body = await request.json()
+        body = _json_loads(await request.body())
     except (json.JSONDecodeError, ValueError):
         pass
+    return await _run_step4_generate_config(project_id, body)
+
+
+async def _run_step4_generate_config(project_id: str, body: dict) -> dict:
+    project = store.get_project(project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    # CSV data: try body first, then KV
-    all_csv_data = body.get("csv_data") or _kv_get(f"csv_data:{project_id}") or ""
-    if not all_csv_data and project.uploaded_files:
-        upload_dir = os.path.join(UPLOAD_DIR, project_id)
-        for f in project.uploaded_files:
-            file_path = os.path.join(upload_dir, f.filename)
-            if os.path.exists(file_path):
-                with open(file_path, "r", encoding="utf-8", errors="ignore") as fp:
-                    content = fp.read()
-                    metadata = CSVParser.parse(content)
-                    all_csv_data += f"\n--- File: {f.filename} ---\n" + CSVParser.to_summary_string(metadata)
+    store.update_project(project_id, analysis_progress=55, analysis_stage="AI generating record types & workflows...")
+
+    # CSV and scraped data: try body first, then KV, fetching whatever is missing in one round-trip.
+    # An empty CSV summary ("") is a real step-1 result (e.g. the uploads are not on this
+    # instance's /tmp); only a missing one (None) means step 1 has not run
+    all_csv_data = body.get("csv_data")
+    scrape_cache = body.get("scrape_data")
+    missing_keys = []
+    if all_csv_data is None:
+        missing_keys.append(f"csv_data:{project_id}")
+    if not scrape_cache:
+        missing_keys.append(f"scrape:{project_id}")
+    cached = dict(zip(missing_keys, _kv_mget(missing_keys)))
+    if all_csv_data is None:
+        all_csv_data = cached.get(f"csv_data:{project_id}")
+    scrape_cache = scrape_cache or cached.get(f"scrape:{project_id}")
+    if all_csv_data is None and project.uploaded_files:
+        # Step 1 always stores (or returns) the summary; don't re-parse the uploads here
+        raise HTTPException(status_code=409, detail="CSV data not parsed yet; run step 1 (parse-csv) first")
+    all_csv_data = all_csv_data or ""
 
     # Load research from project and/or request body
     community_context = ""
@@ -2787,13 +3570,11 @@ async def analyze_step4_generate_config(project_id: str, request: Request):
         except (json.JSONDecodeError, ValueError, TypeError):
             pass
 
-    # Scraped text: try body first, then KV
-    scrape_cache = body.get("scrape_data") or _kv_get(f"scrape:{project_id}")
     if scrape_cache:
         scraped_data = scrape_cache
 
     if research:
-        community_context = _format_research_for_analysis(research)
+        community_context = _cached_research_context(research)
         if scraped_data and scraped_data.get("combined_text"):
             community_context += f"\n\n### Raw Website Content Highlights:\n{scraped_data.get('combined_text', '')[:8000]}"
 
@@ -2808,17 +3589,19 @@ async def analyze_step4_generate_config(project_id: str, request: Request):
 
     # Match peer template
     matched_template = _match_peer_template(all_csv_data, project.customer_name)
-    template_context = _build_intelligence_context(all_csv_data, community_context, matched_template)
+    template_context = _cached_template_context(matched_template)
 
     # Cap all inputs to fit within Vercel's 60-second timeout
-    capped_csv = all_csv_data[:20000] if len(all_csv_data) > 20000 else all_csv_data
-    capped_community = community_context[:15000] if len(community_context) > 15000 else community_context
-    capped_template = template_context[:8000] if len(template_context) > 8000 else template_context
+    # Sanitize each variable input on its own (a no-op when already ASCII) rather than
+    # re-scanning and copying the whole assembled prompt
+    capped_csv = _sanitize_to_ascii(all_csv_data[:20000])
+    capped_community = _sanitize_to_ascii(community_context[:15000])
+    capped_template = _sanitize_to_ascii(template_context[:8000])
 
     # Build combined prompt
     web_source_note = f"(Extracted from real website scrape of {scrape_stats.get('pages_scraped', 0)} pages)" if scrape_stats else ""
 
-    combined_data = _sanitize_to_ascii(f"""## SOURCE 1: Uploaded CSV Data (Primary Source)
+    combined_data = f"""## SOURCE 1: Uploaded CSV Data (Primary Source)
 {capped_csv}
 
 ## SOURCE 2: Community Website Research {web_source_note}
@@ -2830,8 +3613,8 @@ async def analyze_step4_generate_config(project_id: str, request: Request):
 ## SOURCE 4: Industry Best Practices
 Use your knowledge of PLC implementations across hundreds of municipalities to fill in gaps and ensure completeness.
 Every record type should have comprehensive form fields, realistic fees, complete workflows, and appropriate document requirements.
-Do not just map what is in the CSV — build a COMPLETE configuration that this municipality can use immediately.
-""")
+Do not just map what is in the CSV -- build a COMPLETE configuration that this municipality can use immediately.
+"""
 
     store.update_project(project_id, analysis_progress=65, analysis_stage="Building departments & user roles...")
     configuration = claude_service.analyze_csv_data(combined_data)
@@ -2860,19 +3643,25 @@ Do not just map what is in the CSV — build a COMPLETE configuration that this
             "peer_template": {"template_name": matched_template.get("name",""), "template_id": matched_template.get("id","")},
         }
 
-    # Build data_connections showing how each record type was informed
+    # Build data_connections showing how each record type was informed, plus the
+    # per-record-type summary for the activity stream in the same pass
     data_connections = []
+    rt_details = []
     if hasattr(configuration, 'record_types'):
+        rt_names = [rt.name.lower() for rt in configuration.record_types]
+        csv_hits = _find_terms(rt_names, all_csv_data.lower())
+        ctx_hits = _find_terms(rt_names, community_context.lower())
         for rt in configuration.record_types:
             conn = {"record_type": rt.name, "sources": {}}
-            if all_csv_data and rt.name.lower() in all_csv_data.lower():
+            if rt.name.lower() in csv_hits:
                 conn["sources"]["csv"] = f"Found references in uploaded CSV data"
-            if community_context and rt.name.lower() in community_context.lower():
+            if rt.name.lower() in ctx_hits:
                 conn["sources"]["website"] = f"Extracted from community website"
             conn["sources"]["ai_best_practices"] = "Enhanced with industry best practices"
             if matched_template.get("name"):
                 conn["sources"]["peer_template"] = f"Informed by {matched_template['name']} template"
             data_connections.append(conn)
+            rt_details.append({"name": rt.name, "category": rt.category, "fees_count": len(rt.fees), "fields_count": len(rt.form_fields)})
 
     # Save
     store.save_configuration(project_id, configuration)
@@ -2881,7 +3670,7 @@ Do not just map what is in the CSV — build a COMPLETE configuration that this
         status="configured",
         analysis_progress=100,
         analysis_stage="Complete",
-        intelligence_report=json.dumps(intel_report)
+        intelligence_report=_json_dumps(intel_report)
     )
     # Ensure full project is persisted to KV including configuration
     store._persist_project(project_id)
@@ -2896,7 +3685,7 @@ Do not just map what is in the CSV — build a COMPLETE configuration that this
             "title": "Generated Full Configuration",
             "description": f"Created {rt_count} record types, {dept_count} departments, {role_count} user roles",
             "details": {
-                "record_types": [{"name": rt.name, "category": rt.category, "fees_count": len(rt.fees), "fields_count": len(rt.form_fields)} for rt in configuration.record_types] if hasattr(configuration, 'record_types') else [],
+                "record_types": rt_details,
                 "departments": [d.name for d in configuration.departments] if hasattr(configuration, 'departments') else [],
                 "user_roles": [r.name for r in configuration.user_roles] if hasattr(configuration, 'user_roles') else [],
                 "data_connections": data_connections,
@@ -2908,10 +3697,44 @@ Do not just map what is in the CSV — build a COMPLETE configuration that this
     }
 
 
+@app.post("/api/projects/{project_id}/analyze/run-all")
+async def analyze_run_all(project_id: str):
+    """Run all four analysis steps, parsing CSVs and scraping the website concurrently"""
+    project = store.get_project(project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not project.uploaded_files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+
+    # Steps 1 and 2 are independent; step 3 needs the scrape, step 4 needs everything
+    csv_result, scrape_result = await asyncio.gather(
+        _run_step1_parse_csv(project_id),
+        _run_step2_scrape_website(project_id, {}),
+    )
+    # Hand step 1's summary to step 4 even when it is "" (no uploads on this instance), so
+    # step 4 never mistakes it for a skipped step; check it before paying for steps 3 and 4
+    csv_data = csv_result.get("csv_data")
+    if not isinstance(csv_data, str):
+        raise HTTPException(status_code=500, detail="CSV parsing returned no summary")
+    scrape_data = scrape_result.get("scrape_data")
+    extract_result = await _run_step3_extract_data(project_id, {"scrape_data": scrape_data})
+    config_result = await _run_step4_generate_config(project_id, {
+        "csv_data": csv_data,
+        "scrape_data": scrape_data,
+        "research_data": extract_result.get("research_data"),
+    })
+
+    return {
+        "status": config_result["status"],
+        "activities": [r["activity"] for r in (csv_result, scrape_result, extract_result, config_result)],
+        "intelligence": config_result["intelligence"],
+    }
+
+
 @app.get("/api/projects/{project_id}/analysis-status")
 async def get_analysis_status(project_id: str):
     """Get current analysis status and progress"""
-    project = store.get_project(project_id)
+    project = store.get_project_model(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return {
@@ -2936,7 +3759,7 @@ async def get_sample_csv(project_id: str):
 @app.get("/api/projects/{project_id}/configurations")
 async def get_configurations(project_id: str):
     """Get the configuration for a project"""
-    project = store.get_project(project_id)
+    project = store.get_project_model(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if not project.configuration:
@@ -3011,18 +3834,46 @@ async def update_role(project_id: str, role_id: str, request: UpdateRoleRequest)
 # HEALTH CHECK
 # ============================================================================
 
+_health_cache = {"ts": 0.0, "value": None}
+
+
+def _kv_health_probe() -> tuple:
+    """Write/read round-trip plus project key count (sync, run in a worker thread).
+
+    Returns:
+        (kv_working, kv_error, projects_in_kv)
+    """
+    kv_test = False
+    kv_error = None
+    try:
+        _kv_set("_health_check", {"ts": datetime.utcnow().isoformat()})
+        result = _kv_get("_health_check")
+        kv_test = result is not None
+    except Exception as e:
+        kv_error = str(e)
+
+    # Also count KV projects
+    kv_project_count = 0
+    try:
+        kv_project_count = len(_kv_keys("project:*"))
+    except Exception:
+        pass
+    return kv_test, kv_error, kv_project_count
+
+
 @app.get("/api/health")
 async def health_check():
+    # Load balancer pings would otherwise cost a SET, GET and KEYS each
+    now = _time_module.monotonic()
+    if _health_cache["value"] and now - _health_cache["ts"] < HEALTH_CACHE_TTL:
+        return _health_cache["value"]
+
     kv_status = "connected" if KV_AVAILABLE else "not configured"
     kv_test = False
     kv_error = None
+    kv_project_count = 0
     if KV_AVAILABLE:
-        try:
-            _kv_set("_health_check", {"ts": datetime.utcnow().isoformat()})
-            result = _kv_get("_health_check")
-            kv_test = result is not None
-        except Exception as e:
-            kv_error = str(e)
+        kv_test, kv_error, kv_project_count = await asyncio.to_thread(_kv_health_probe)
 
     # Check which env vars are present (masked for security)
     env_check = {
@@ -3035,16 +3886,8 @@ async def health_check():
     }
 
     project_count = len(store._projects)
-    # Also count KV projects
-    kv_project_count = 0
-    if KV_AVAILABLE:
-        try:
-            kv_keys = _kv_keys("project:*")
-            kv_project_count = len(kv_keys)
-        except Exception:
-            pass
 
-    return {
+    result = {
         "status": "healthy",
         "storage": {
             "kv": kv_status,
@@ -3057,6 +3900,9 @@ async def health_check():
         "env_vars": env_check,
         "ai": claude_service.get_status()
     }
+    _health_cache["ts"] = now
+    _health_cache["value"] = result
+    return result
 
 
 @app.get("/api/kv-status")
@@ -3071,13 +3917,19 @@ async def kv_status():
 @app.get("/api/projects/{project_id}/configurations/export")
 async def export_configuration(project_id: str):
     """Export the full project configuration as a JSON document."""
-    project = store.get_project(project_id)
+    project = store.get_project_model(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     if not project.configuration:
         raise HTTPException(status_code=404, detail="No configuration generated yet")
 
     config = project.configuration
+    total_form_fields = total_workflow_steps = total_fees = 0
+    for rt in config.record_types:
+        total_form_fields += len(rt.form_fields)
+        total_workflow_steps += len(rt.workflow_steps)
+        total_fees += len(rt.fees)
+
     export_data = {
         "export_version": "1.0",
         "exported_at": datetime.utcnow().isoformat(),
@@ -3091,17 +3943,17 @@ async def export_configuration(project_id: str):
         "configuration": {
             "summary": config.summary,
             "generated_at": config.generated_at.isoformat() if config.generated_at else None,
-            "record_types": [rt.model_dump() for rt in config.record_types],
-            "departments": [d.model_dump() for d in config.departments],
-            "user_roles": [r.model_dump() for r in config.user_roles],
+            "record_types": _RECORD_TYPES_ADAPTER.dump_python(config.record_types),
+            "departments": _DEPARTMENTS_ADAPTER.dump_python(config.departments),
+            "user_roles": _USER_ROLES_ADAPTER.dump_python(config.user_roles),
         },
         "statistics": {
             "record_types_count": len(config.record_types),
             "departments_count": len(config.departments),
             "user_roles_count": len(config.user_roles),
-            "total_form_fields": sum(len(rt.form_fields) for rt in config.record_types),
-            "total_workflow_steps": sum(len(rt.workflow_steps) for rt in config.record_types),
-            "total_fees": sum(len(rt.fees) for rt in config.record_types),
+            "total_form_fields": total_form_fields,
+            "total_workflow_steps": total_workflow_steps,
+            "total_fees": total_fees,
         },
     }
     return export_data
@@ -3114,17 +3966,22 @@ async def export_configuration(project_id: str):
 @app.get("/api/projects/{project_id}/intelligence")
 async def get_intelligence_report(project_id: str):
     """Get the auto-generated intelligence report for a project"""
-    project = store.get_project(project_id)
+    project = store.get_project_model(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    report = None
+    report_key = None
     if project.intelligence_report:
+        # The frontend polls this endpoint; an unchanged report is served from the cached body
+        report_key = hashlib.blake2b(project.intelligence_report.encode(), digest_size=16).digest()
+        cached = _intelligence_response_cache.get(report_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
         try:
-            report = json.loads(project.intelligence_report)
-        except (json.JSONDecodeError, TypeError):
+            report = _json_loads(project.intelligence_report)
+        except (json.JSONDecodeError, ValueError, TypeError):
             report = None
-    else:
-        report = None
 
     if not report:
         return {
@@ -3132,29 +3989,197 @@ async def get_intelligence_report(project_id: str):
             "message": "Intelligence analysis has not been run yet. Upload files and run analysis first."
         }
 
-    return {
+    body = _json_dumps({
         "status": "available",
         "report": report
-    }
+    }).encode()
+    _cache_put(_intelligence_response_cache, report_key, body)
+    return Response(content=body, media_type="application/json")
 
 
 
 # ═══════════════════════════════════════════════════════════════
 # 7. WEB SCRAPING
 # ═══════════════════════════════════════════════════════════════
-def scrape_community_website(base_url: str, max_pages: int = 100, continuation: Optional[Dict] = None) -> dict:
+_SCRAPE_SKIP_TAGS = ['script', 'style', 'nav', 'footer', 'header', 'noscript']
+_SKIP_HREF_RE = re.compile(r'#|javascript:|mailto:')
+# Non-web resources the crawler never fetches; a tuple so str.endswith tests them all in one call
+_SCRAPE_SKIP_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.svg', '.css', '.js', '.ico', '.woff', '.woff2', '.ttf', '.mp4', '.mp3', '.zip')
+# Inline script/style bodies hold no links or page text; removing them up front spares
+# the stdlib parser a handle_data callback per chunk it would only throw away
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+# Keywords that indicate permit/license content — weighted for URL prioritization
+HIGH_PRIORITY_URL_KEYWORDS = [
+    'permit', 'license', 'fee', 'schedule', 'application', 'form',
+    'building', 'planning', 'zoning', 'code-enforcement', 'inspection',
+    'ordinance', 'municipal-code', 'development-services', 'title-', 'chapter-',
+    'section-', 'regulation', 'standard', 'policy', 'procedure', 'guideline',
+    'requirement', 'fee-schedule', 'rate-schedule', 'master-fee', 'development-code',
+    'land-use', 'general-plan', 'specific-plan', 'design-standard', 'improvement-standard',
+    'subdivision', 'grading', 'stormwater', 'fire-prevention', 'public-works',
+    'utilities', 'water', 'sewer', 'encroachment', 'right-of-way', 'impact-fee',
+    'mitigation', 'environmental', 'ceqa'
+]
+MEDIUM_PRIORITY_URL_KEYWORDS = [
+    'department', 'public-works', 'services', 'community-development',
+    'engineering', 'fire-prevention', 'business', 'contractor',
+    'requirements', 'submittal', 'review', 'approval'
+]
+CONTENT_RELEVANCE_KEYWORDS = [
+    'permit', 'license', 'application', 'fee', 'schedule', 'ordinance',
+    'building', 'planning', 'zoning', 'code', 'enforcement', 'inspection',
+    'department', 'public works', 'development', 'services', 'forms',
+    'requirements', 'submittal', 'review', 'approval', 'contractor',
+    'business', 'occupation', 'sign', 'demolition', 'grading',
+    'electrical', 'plumbing', 'mechanical', 'fire', 'safety',
+    'conditional use', 'variance', 'subdivision', 'encroachment',
+    'right-of-way', 'impact fee', 'plan check', 'certificate', 'resolution',
+    'amendment', 'codified', 'chapter', 'section', 'title', 'municipal',
+    'regulation', 'standard', 'policy', 'procedure', 'guideline', 'rate',
+    'surcharge', 'deposit', 'bond', 'plan check', 'plan review', 'valuation',
+    'square foot', 'per unit', 'flat fee', 'hourly rate', 'technology fee',
+    'administrative fee', 'appeal', 'hearing', 'commission', 'council', 'board',
+    'review authority'
+]
+
+_HIGH_PRIORITY_URL_RE = re.compile("|".join(map(re.escape, HIGH_PRIORITY_URL_KEYWORDS)))
+_MEDIUM_PRIORITY_URL_RE = re.compile("|".join(map(re.escape, MEDIUM_PRIORITY_URL_KEYWORDS)))
+# Every list entry found scores a point, so a keyword listed twice scores twice
+_CONTENT_KEYWORD_WEIGHTS = Counter(CONTENT_RELEVANCE_KEYWORDS)
+
+if AHOCORASICK_AVAILABLE:
+    _CONTENT_KEYWORD_AC = ahocorasick.Automaton()
+    for _kw in _CONTENT_KEYWORD_WEIGHTS:
+        _CONTENT_KEYWORD_AC.add_word(_kw, _kw)
+    _CONTENT_KEYWORD_AC.make_automaton()
+
+
+def _url_priority(link_url: str) -> int:
+    """Score a URL for crawl priority (lower = higher priority)."""
+    lower = link_url.lower()
+    if _HIGH_PRIORITY_URL_RE.search(lower):
+        return 1
+    if _MEDIUM_PRIORITY_URL_RE.search(lower):
+        return 2
+    return 3
+
+
+def _content_relevance(page_lower: str) -> int:
+    """Count the CONTENT_RELEVANCE_KEYWORDS entries found in lowercased page text.
+
+    Keywords overlap ("fee" / "flat fee", "review" / "plan review"), so matching
+    needs every occurrence rather than a non-overlapping regex scan.
+    """
+    if AHOCORASICK_AVAILABLE:
+        found = {kw for _, kw in _CONTENT_KEYWORD_AC.iter(page_lower)}
+    else:
+        found = {kw for kw in _CONTENT_KEYWORD_WEIGHTS if kw in page_lower}
+    return sum(_CONTENT_KEYWORD_WEIGHTS[kw] for kw in found)
+
+
+VISITED_DIGEST_SIZE = 8
+
+
+def _visited_key(url: str) -> bytes:
+    """Fixed-size digest standing in for a URL in the crawler's visited set.
+
+    At 8 bytes the chance of a false "already visited" is negligible for crawls of
+    this size, and the set stays small in memory and in the continuation payload.
+    """
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=VISITED_DIGEST_SIZE).digest()
+
+
+def _decode_visited(continuation: dict) -> set:
+    """Rebuild the visited digest set from continuation data (including the older URL-list form)."""
+    if "visited_digests" in continuation:
+        raw = base64.b64decode(continuation["visited_digests"])
+        return {raw[i:i + VISITED_DIGEST_SIZE] for i in range(0, len(raw), VISITED_DIGEST_SIZE)}
+    return {_visited_key(url) for url in continuation.get('visited', [])}
+
+
+class _LinkTextExtractor(HTMLParser):
+    """Stdlib fallback for _extract_links_and_text when selectolax is not installed."""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self.text_parts = []
+        self.title = ""
+        self._in_body = False
+        self._in_title = False
+        self._skip_tags = set(_SCRAPE_SKIP_TAGS)
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._skip_tags:
+            self._skip_depth += 1
+        if tag == 'body':
+            self._in_body = True
+        if tag == 'title':
+            self._in_title = True
+        href = dict(attrs).get('href', '')
+        if href and not _SKIP_HREF_RE.match(href):
+            self.links.append(href)
+
+    def handle_endtag(self, tag):
+        if tag in self._skip_tags and self._skip_depth > 0:
+            self._skip_depth -= 1
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data.strip()
+        if self._in_body and self._skip_depth == 0:
+            text = data.strip()
+            if text:
+                self.text_parts.append(text)
+
+
+def _extract_links_and_text(html: str) -> tuple:
+    """Pull (title, body text fragments, hrefs) out of a crawled page's HTML.
+
+    Text inside script/style/nav/footer/header/noscript is skipped; links are
+    collected from the whole document.
+    """
+    if not SELECTOLAX_AVAILABLE:
+        parser = _LinkTextExtractor()
+        parser.feed(_SCRIPT_STYLE_RE.sub('', html))
+        return parser.title, parser.text_parts, parser.links
+
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first('title')
+    title = title_node.text(strip=True) if title_node else ""
+    links = [href for href in (node.attributes.get('href') for node in tree.css('[href]'))
+             if href and not _SKIP_HREF_RE.match(href)]
+
+    text_parts = []
+    if tree.body is not None:
+        tree.strip_tags(_SCRAPE_SKIP_TAGS)
+        for node in tree.body.traverse(include_text=True):
+            if node.tag == '-text':
+                text = node.text(deep=False).strip()
+                if text:
+                    text_parts.append(text)
+    return title, text_parts, links
+
+
+def scrape_community_website(base_url: str, max_pages: int = 100, continuation: Optional[Dict] = None,
+                              max_bytes_per_page: int = 512 * 1024) -> dict:
     """Scrape a government website comprehensively for permit/license/fee content.
 
     Supports multi-pass scraping with continuation data. Can resume from a previous
     incomplete pass and follows links to known municipal code hosting sites.
+    Only the first max_bytes_per_page bytes of each page are read; at most 8000
+    characters of a page's text are kept anyway.
 
     Returns structured scrape data including pages, PDFs, and combined text.
     Used by the unified analysis pipeline.
     """
-    import urllib.request
     import urllib.parse
     import time as _time
-    from html.parser import HTMLParser
 
     # Known municipal code hosting domains to follow cross-domain
     KNOWN_MUNICIPAL_CODE_DOMAINS = {
@@ -3170,104 +4195,28 @@ def scrape_community_website(base_url: str, max_pages: int = 100, continuation:
         'codebook.com'
     }
 
-    # Initialize or restore state from continuation
+    # Initialize or restore state from continuation. The queue is a heap of
+    # (priority, sequence, url); the sequence keeps equal priorities first-in, first-out
+    queue_seq = itertools.count()
     if continuation:
-        visited = set(continuation.get('visited', []))
-        priority_queue = continuation.get('queue', [(0, base_url)])
+        visited = _decode_visited(continuation)
+        priority_queue = [(p, next(queue_seq), u) for p, u in continuation.get('queue', [(0, base_url)])]
+        heapq.heapify(priority_queue)
         scraped_pages = continuation.get('pages', [])
         pdf_links = continuation.get('pdfs', [])
+        seen_pdf_urls = {pdf["url"] for pdf in pdf_links}
         pages_analyzed = len(scraped_pages)
         pass_number = continuation.get('pass_number', 1)
-        print(f"[SCRAPE] Resuming pass {pass_number}: {len(scraped_pages)} pages, {len(visited)} visited, {len(priority_queue)} queued")
+        logger.info("[SCRAPE] Resuming pass %s: %s pages, %s visited, %s queued", pass_number, len(scraped_pages), len(visited), len(priority_queue))
     else:
         visited = set()
-        priority_queue = [(0, base_url)]
+        priority_queue = [(0, next(queue_seq), base_url)]
         scraped_pages = []
         pdf_links = []
+        seen_pdf_urls = set()
         pages_analyzed = 0
         pass_number = 1
 
-    # Simple HTML parser to extract links and text
-    class LinkTextExtractor(HTMLParser):
-        def __init__(self):
-            super().__init__()
-            self.links = []
-            self.text_parts = []
-            self.title = ""
-            self._in_body = False
-            self._in_title = False
-            self._skip_tags = {'script', 'style', 'nav', 'footer', 'header', 'noscript'}
-            self._skip_depth = 0
-
-        def handle_starttag(self, tag, attrs):
-            if tag in self._skip_tags:
-                self._skip_depth += 1
-            if tag == 'body':
-                self._in_body = True
-            if tag == 'title':
-                self._in_title = True
-            attrs_dict = dict(attrs)
-            href = attrs_dict.get('href', '')
-            if href and not href.startswith('#') and not href.startswith('javascript:') and not href.startswith('mailto:'):
-                self.links.append(href)
-
-        def handle_endtag(self, tag):
-            if tag in self._skip_tags and self._skip_depth > 0:
-                self._skip_depth -= 1
-            if tag == 'title':
-                self._in_title = False
-
-        def handle_data(self, data):
-            if self._in_title:
-                self.title += data.strip()
-            if self._in_body and self._skip_depth == 0:
-                text = data.strip()
-                if text:
-                    self.text_parts.append(text)
-
-    # Keywords that indicate permit/license content — weighted for URL prioritization
-    HIGH_PRIORITY_URL_KEYWORDS = [
-        'permit', 'license', 'fee', 'schedule', 'application', 'form',
-        'building', 'planning', 'zoning', 'code-enforcement', 'inspection',
-        'ordinance', 'municipal-code', 'development-services', 'title-', 'chapter-',
-        'section-', 'regulation', 'standard', 'policy', 'procedure', 'guideline',
-        'requirement', 'fee-schedule', 'rate-schedule', 'master-fee', 'development-code',
-        'land-use', 'general-plan', 'specific-plan', 'design-standard', 'improvement-standard',
-        'subdivision', 'grading', 'stormwater', 'fire-prevention', 'public-works',
-        'utilities', 'water', 'sewer', 'encroachment', 'right-of-way', 'impact-fee',
-        'mitigation', 'environmental', 'ceqa'
-    ]
-    MEDIUM_PRIORITY_URL_KEYWORDS = [
-        'department', 'public-works', 'services', 'community-development',
-        'engineering', 'fire-prevention', 'business', 'contractor',
-        'requirements', 'submittal', 'review', 'approval'
-    ]
-    CONTENT_RELEVANCE_KEYWORDS = [
-        'permit', 'license', 'application', 'fee', 'schedule', 'ordinance',
-        'building', 'planning', 'zoning', 'code', 'enforcement', 'inspection',
-        'department', 'public works', 'development', 'services', 'forms',
-        'requirements', 'submittal', 'review', 'approval', 'contractor',
-        'business', 'occupation', 'sign', 'demolition', 'grading',
-        'electrical', 'plumbing', 'mechanical', 'fire', 'safety',
-        'conditional use', 'variance', 'subdivision', 'encroachment',
-        'right-of-way', 'impact fee', 'plan check', 'certificate', 'resolution',
-        'amendment', 'codified', 'chapter', 'section', 'title', 'municipal',
-        'regulation', 'standard', 'policy', 'procedure', 'guideline', 'rate',
-        'surcharge', 'deposit', 'bond', 'plan check', 'plan review', 'valuation',
-        'square foot', 'per unit', 'flat fee', 'hourly rate', 'technology fee',
-        'administrative fee', 'appeal', 'hearing', 'commission', 'council', 'board',
-        'review authority'
-    ]
-
-    def _url_priority(link_url: str) -> int:
-        """Score a URL for crawl priority (lower = higher priority)."""
-        lower = link_url.lower()
-        if any(kw in lower for kw in HIGH_PRIORITY_URL_KEYWORDS):
-            return 1
-        if any(kw in lower for kw in MEDIUM_PRIORITY_URL_KEYWORDS):
-            return 2
-        return 3
-
     def _is_allowed_domain(parsed_url, parsed_base) -> bool:
         """Check if a URL is on an allowed domain (same domain or known municipal code host)."""
         if not parsed_url.netloc:
@@ -3277,75 +4226,103 @@ def scrape_community_website(base_url: str, max_pages: int = 100, continuation:
         # Check if it's a known municipal code hosting domain
         return parsed_url.netloc in KNOWN_MUNICIPAL_CODE_DOMAINS
 
-    all_text_content = []
+    # combined_text is built as it goes and stops growing at the cap, rather than
+    # joining every page's text at the end only to slice most of it away
+    combined_parts = []
+    combined_len = 0
+    total_text_length = 0
     parsed_base = urllib.parse.urlparse(base_url)
-    start_time = _time.time()
+    # Monotonic clock, so a wall-clock adjustment mid-crawl can't stretch or cut the pass
+    start_time = _time.monotonic()
+    deadline = start_time + SCRAPE_TIME_LIMIT
 
-    print(f"[SCRAPE] Starting pass {pass_number} of {base_url} (max {max_pages} pages, 45s timeout)")
+    logger.info("[SCRAPE] Starting pass %s of %s (max %s pages, %ss timeout)", pass_number, base_url, max_pages, SCRAPE_TIME_LIMIT)
 
-    pages_in_this_pass = 0
-    while priority_queue and pages_in_this_pass < max_pages:
-        # Check 45-second wall-clock time limit
-        elapsed = _time.time() - start_time
-        if elapsed > 45:
-            print(f"[SCRAPE] Time limit reached ({elapsed:.1f}s > 45s), stopping pass {pass_number}")
-            break
-
-        # Sort by priority and take the best
-        priority_queue.sort(key=lambda x: x[0])
-        _priority, current_url = priority_queue.pop(0)
-
-        # Normalize URL
-        if not current_url.startswith('http'):
-            current_url = urllib.parse.urljoin(base_url, current_url)
-
-        # Remove fragments and normalize
-        parsed_current = urllib.parse.urlparse(current_url)
-        current_url = urllib.parse.urlunparse(parsed_current._replace(fragment=''))
-
-        # Skip if already visited
-        if current_url in visited:
-            continue
+    def _fetch(fetch_url: str):
+        """Fetch and parse one URL; returns ("pdf", None), ("html", page) or None to skip it.
 
-        # Check domain policy (same domain or known municipal code host)
-        if not _is_allowed_domain(parsed_current, parsed_base):
-            continue
-
-        # Skip non-web resources
-        if any(current_url.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif', '.svg', '.css', '.js', '.ico', '.woff', '.woff2', '.ttf', '.mp4', '.mp3', '.zip']):
-            continue
+        Parsing runs here on the worker thread, so one page is parsed while the rest of
+        its batch is still on the network. page is (title, text, relevance, links).
+        """
+        try:
+            with _get_scrape_http().stream("GET", fetch_url) as resp:
+                # Skip error pages, as urlopen did by raising
+                resp.raise_for_status()
+                content_type = resp.headers.get('Content-Type', '').lower()
+                if 'pdf' in content_type:
+                    return "pdf", None
+                if 'html' not in content_type and 'text' not in content_type:
+                    return None
+                # Stop reading once the cap is reached instead of pulling in the whole body
+                body = bytearray()
+                for chunk in resp.iter_bytes():
+                    body += chunk
+                    if len(body) >= max_bytes_per_page:
+                        del body[max_bytes_per_page:]
+                        break
+            raw_title, text_parts, page_links = _extract_links_and_text(body.decode('utf-8', errors='ignore'))
+        except Exception:
+            return None
 
-        visited.add(current_url)
+        page_text = _sanitize_to_ascii(' '.join(text_parts))
+        page_title = _sanitize_to_ascii(raw_title.strip()) or fetch_url
+        # Check if page has relevant content
+        relevance_score = _content_relevance(page_text.lower())
+        return "html", (page_title, page_text, relevance_score, page_links)
 
-        try:
-            req = urllib.request.Request(current_url, headers={
-                'User-Agent': 'Mozilla/5.0 (compatible; OpenGov-AutoConfig/1.0)'
-            })
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                content_type = resp.headers.get('Content-Type', '')
+    pages_in_this_pass = 0
+    with ThreadPoolExecutor(max_workers=SCRAPE_CONCURRENCY) as pool:
+        while priority_queue and pages_in_this_pass < max_pages:
+            # Check the per-pass time limit
+            now = _time.monotonic()
+            if now > deadline:
+                logger.info("[SCRAPE] Time limit reached (%.1fs > %ss), stopping pass %s", now - start_time, SCRAPE_TIME_LIMIT, pass_number)
+                break
+
+            # Take the best few URLs that are still worth fetching
+            batch = []
+            batch_size = min(SCRAPE_CONCURRENCY, max_pages - pages_in_this_pass)
+            while priority_queue and len(batch) < batch_size:
+                # Take the best-priority URL
+                _priority, _seq, current_url = heapq.heappop(priority_queue)
+
+                # Normalize URL
+                if not current_url.startswith('http'):
+                    current_url = urllib.parse.urljoin(base_url, current_url)
+
+                # Remove fragment
+                current_url = current_url.partition('#')[0]
+
+                # Skip if already visited
+                url_key = _visited_key(current_url)
+                if url_key in visited:
+                    continue
 
-                if 'pdf' in content_type.lower():
-                    filename = current_url.split('/')[-1] or 'document.pdf'
-                    pdf_links.append({"url": current_url, "filename": filename, "found_on": "direct"})
+                # Check domain policy (same domain or known municipal code host)
+                if not _is_allowed_domain(urllib.parse.urlparse(current_url), parsed_base):
                     continue
 
-                if 'html' not in content_type.lower() and 'text' not in content_type.lower():
+                # Skip non-web resources
+                if current_url.lower().endswith(_SCRAPE_SKIP_EXTENSIONS):
                     continue
 
-                html = resp.read().decode('utf-8', errors='ignore')
+                visited.add(url_key)
+                batch.append(current_url)
 
-                parser = LinkTextExtractor()
-                try:
-                    parser.feed(html)
-                except Exception:
+            # Fetch and parse the batch concurrently; results are then recorded in priority order
+            for current_url, fetched in zip(batch, pool.map(_fetch, batch)):
+                if fetched is None:
                     continue
+                kind, page = fetched
 
-                page_text = _sanitize_to_ascii(' '.join(parser.text_parts))
-                page_title = _sanitize_to_ascii(parser.title.strip()) or current_url
+                if kind == "pdf":
+                    if current_url not in seen_pdf_urls:
+                        seen_pdf_urls.add(current_url)
+                        filename = current_url.split('/')[-1] or 'document.pdf'
+                        pdf_links.append({"url": current_url, "filename": filename, "found_on": "direct"})
+                    continue
 
-                # Check if page has relevant content
-                page_lower = page_text.lower()
-                relevance_score = sum(1 for kw in CONTENT_RELEVANCE_KEYWORDS if kw in page_lower)
+                page_title, page_text, relevance_score, page_links = page
 
                 # Always store the page if it has some relevance (lower threshold for broader coverage)
                 if relevance_score >= 1:
@@ -3356,68 +4333,65 @@ def scrape_community_website(base_url: str, max_pages: int = 100, continuation:
                         "text_length": len(page_text),
                         "text": page_text[:8000]  # Store more text per page
                     })
-                    all_text_content.append(
-                        f"--- PAGE: {page_title} ({current_url}) [relevance: {relevance_score}] ---\n{page_text[:8000]}\n"
-                    )
+                    entry = f"--- PAGE: {page_title} ({current_url}) [relevance: {relevance_score}] ---\n{page_text[:8000]}\n"
+                    total_text_length += len(entry)
+                    if combined_len < COMBINED_TEXT_CAP:
+                        if combined_parts:
+                            entry = '\n\n' + entry
+                        entry = entry[:COMBINED_TEXT_CAP - combined_len]
+                        combined_parts.append(entry)
+                        combined_len += len(entry)
 
                 # Discover new links
-                for link in parser.links:
-                    full_link = urllib.parse.urljoin(current_url, link)
-                    # Remove fragment
-                    full_link = urllib.parse.urlunparse(urllib.parse.urlparse(full_link)._replace(fragment=''))
+                for link in page_links:
+                    # Remove fragment; only links that survive the checks below are parsed
+                    full_link = urllib.parse.urljoin(current_url, link).partition('#')[0]
 
-                    if full_link in visited:
+                    if _visited_key(full_link) in visited:
                         continue
 
                     if full_link.lower().endswith('.pdf'):
-                        filename = full_link.split('/')[-1] or 'document.pdf'
-                        pdf_links.append({"url": full_link, "filename": filename, "found_on": current_url})
+                        # PDF links are deduplicated by URL as they are found
+                        if full_link not in seen_pdf_urls:
+                            seen_pdf_urls.add(full_link)
+                            filename = full_link.split('/')[-1] or 'document.pdf'
+                            pdf_links.append({"url": full_link, "filename": filename, "found_on": current_url})
                     else:
                         # Check if domain is allowed (same domain or known municipal code host)
-                        parsed_link = urllib.parse.urlparse(full_link)
-                        if _is_allowed_domain(parsed_link, parsed_base):
+                        if _is_allowed_domain(urllib.parse.urlparse(full_link), parsed_base):
                             priority = _url_priority(full_link)
-                            priority_queue.append((priority, full_link))
+                            heapq.heappush(priority_queue, (priority, next(queue_seq), full_link))
 
                 pages_in_this_pass += 1
 
-            # Polite crawling: 0.2s delay between requests
-            _time.sleep(0.2)
-
-        except Exception as e:
-            continue
-
-    # Deduplicate PDF links by URL
-    seen_pdfs = set()
-    unique_pdfs = []
-    for pdf in pdf_links:
-        if pdf["url"] not in seen_pdfs:
-            seen_pdfs.add(pdf["url"])
-            unique_pdfs.append(pdf)
+            # Polite crawling: 0.2s delay between batches
+            if batch:
+                _time.sleep(0.2)
 
     # Sort scraped pages by relevance (highest first)
     scraped_pages.sort(key=lambda p: p.get("relevance", 0), reverse=True)
 
-    print(f"[SCRAPE] Pass {pass_number} complete: {len(scraped_pages)} total pages, {len(unique_pdfs)} PDFs, {len(visited)} URLs visited, {pages_in_this_pass} in this pass")
+    logger.info("[SCRAPE] Pass %s complete: %s total pages, %s PDFs, %s URLs visited, %s in this pass", pass_number, len(scraped_pages), len(pdf_links), len(visited), pages_in_this_pass)
 
     # Prepare continuation data for next pass
     continuation_data = {
-        "visited": list(visited),
-        "queue": priority_queue[:200],  # Cap to avoid huge response
+        "visited_digests": base64.b64encode(b"".join(visited)).decode("ascii"),
+        # Best 200 in order, as [priority, url] pairs; capped to avoid a huge response
+        "queue": [(p, u) for p, _seq, u in heapq.nsmallest(200, priority_queue)],
         "pages": scraped_pages,
-        "pdfs": unique_pdfs,
+        "pdfs": pdf_links,
         "pass_number": pass_number + 1,
         "has_more": len(priority_queue) > 0
     }
 
     return {
         "pages": scraped_pages,
-        "pdfs": unique_pdfs,
+        "pdfs": pdf_links,
         "pages_scraped": len(scraped_pages),
-        "pdfs_found": len(unique_pdfs),
+        "pdfs_found": len(pdf_links),
         "total_chars": sum(len(p.get("text", "")) for p in scraped_pages),
-        "total_text_length": sum(len(t) for t in all_text_content),
-        "combined_text": '\n\n'.join(all_text_content)[:150000],  # Cap at 150k chars
+        "total_text_length": total_text_length,
+        "combined_text": ''.join(combined_parts),
         "urls_visited": len(visited),
         "scraped_at": datetime.utcnow().isoformat(),
         "continuation": continuation_data
@@ -3433,17 +4407,96 @@ def scrape_community_website(base_url: str, max_pages: int = 100, continuation:
 # DATA SOURCES - Multi-source context ingestion
 # ============================================================================
 
-PEER_CITY_TEMPLATES = json.loads(
-    (_pathlib.Path(__file__).parent / "templates" / "peer_city_templates.json").read_text()
+PEER_CITY_TEMPLATES = _json_loads(
+    (_pathlib.Path(__file__).parent / "templates" / "peer_city_templates.json").read_bytes()
 )
+_PEER_BY_ID = {t["id"]: t for t in PEER_CITY_TEMPLATES}
+# Listing view (without the heavy configuration sections) and lowercased search text per
+# template, built once; the template file is static for the life of the process
+_PEER_LIST_EXCLUDED_KEYS = frozenset({"record_types", "departments", "user_roles"})
+_PEER_LIST_VIEW = [{k: v for k, v in t.items() if k not in _PEER_LIST_EXCLUDED_KEYS} for t in PEER_CITY_TEMPLATES]
+_PEER_SEARCH_INDEX = [(t["name"].lower(), t["description"].lower(), tuple(t["tags"])) for t in PEER_CITY_TEMPLATES]
+
+# Patterns for the data-source parsers' non-AI fallbacks, compiled once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+_FORM_FIELD_LABEL_RE = re.compile(r'([A-Z][A-Za-z\s/]+)[:_]{1,}')
+_FEE_AMOUNT_RE = re.compile(r'([A-Za-z][A-Za-z\s/()-]+?)\s*[\$:]?\s*\$\s*(\d+(?:,\d{3})*(?:\.\d{2})?)')
+
+
+# Keyword fallback for parse_municipal_code when AI extraction is unavailable
+MUNICIPAL_CODE_KEYWORDS = {
+    "permits": ["building permit", "grading permit", "demolition permit", "electrical permit",
+                "plumbing permit", "mechanical permit", "sign permit", "encroachment permit",
+                "excavation permit", "fire permit", "special event permit", "conditional use",
+                "variance", "site plan", "subdivision", "zoning permit"],
+    "licenses": ["business license", "contractor license", "liquor license", "vendor permit",
+                 "home occupation", "peddler license", "taxi license", "alarm permit",
+                 "dog license", "solicitor permit", "rental license"],
+    "enforcement": ["code enforcement", "violation", "nuisance", "abatement", "citation",
+                    "property maintenance", "zoning violation", "abandoned vehicle",
+                    "overgrown vegetation", "illegal dumping"]
+}
+
+if AHOCORASICK_AVAILABLE:
+    _MUNICIPAL_CODE_KEYWORD_AC = ahocorasick.Automaton()
+    for _terms in MUNICIPAL_CODE_KEYWORDS.values():
+        for _kw in _terms:
+            _MUNICIPAL_CODE_KEYWORD_AC.add_word(_kw, _kw)
+    _MUNICIPAL_CODE_KEYWORD_AC.make_automaton()
+
+
+class _PlainTextExtractor(HTMLParser):
+    """Stdlib fallback for _html_to_text when selectolax is not installed."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip_depth > 0:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth == 0:
+            self.parts.append(data)
+
 
-def _extract_with_ai(prompt_text, project_context="", operation_type="extraction"):
-    """Use Claude to extract structured data from text"""
+def _html_to_text(html: str) -> str:
+    """All text of an HTML document outside script/style, whitespace-collapsed, in one parse."""
+    if not SELECTOLAX_AVAILABLE:
+        parser = _PlainTextExtractor()
+        parser.feed(html)
+        parser.close()
+        text = ' '.join(parser.parts)
+    else:
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(['script', 'style'])
+        text = tree.root.text(separator=' ') if tree.root is not None else ''
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+def _extract_with_ai(prompt_text, project_context="", operation_type="extraction", json_type="auto"):
+    """Use Claude to extract structured data from text.
+
+    json_type is the shape the caller will parse out of the answer ("list", "object" or
+    "auto"); only complete answers that contain it are cached, so a truncated or
+    unparseable response is retried on the next request instead of replayed for a day.
+    """
     if not claude_service.is_available():
-        print(f"[AI] Skipping AI extraction ({operation_type}): service not available")
+        logger.info("[AI] Skipping AI extraction (%s): service not available", operation_type)
         return None
+    # Re-submitting the same text (or re-running reconcile on unchanged sources) reuses the answer
+    cache_key = "ai_extract:" + hashlib.sha256(f"{AI_MODEL}\0{prompt_text}".encode()).hexdigest()
+    cached = _kv_get(cache_key)
+    if isinstance(cached, str):
+        logger.info("[AI] Using cached AI extraction: %s", operation_type)
+        return cached
     try:
-        print(f"[AI] Running AI extraction: {operation_type} ({len(prompt_text)} chars)")
+        logger.info("[AI] Running AI extraction: %s (%s chars)", operation_type, len(prompt_text))
         response = claude_service.client.messages.create(
             model=AI_MODEL,
             max_tokens=AI_MAX_TOKENS,
@@ -3454,27 +4507,35 @@ def _extract_with_ai(prompt_text, project_context="", operation_type="extraction
         try:
             tokens_used = (response.usage.input_tokens or 0) + (response.usage.output_tokens or 0)
             ai_usage_tracker.record_call(operation_type, tokens_used, True)
-            print(f"[AI] Extraction complete: {operation_type} - {tokens_used} tokens")
+            logger.info("[AI] Extraction complete: %s - %s tokens", operation_type, tokens_used)
         except Exception:
             ai_usage_tracker.record_call(operation_type, 0, True)
 
-        return response.content[0].text
+        result = response.content[0].text
+        if response.stop_reason == "end_turn" and _extract_json_from_text(result, json_type) is not None:
+            _kv_set(cache_key, result, ex=AI_EXTRACT_CACHE_TTL)
+        return result
     except Exception as e:
-        print(f"[AI] ERROR in extraction ({operation_type}): {e}")
+        logger.error("[AI] ERROR in extraction (%s): %s", operation_type, e)
         ai_usage_tracker.record_call(operation_type, 0, False)
         return None
 
 
+async def _extract_with_ai_async(prompt_text, project_context="", operation_type="extraction", json_type="auto"):
+    """_extract_with_ai on a worker thread, so the Claude round-trip doesn't block the event loop"""
+    async with _AI_EXTRACT_SEM:
+        return await asyncio.to_thread(_extract_with_ai, prompt_text, project_context, operation_type, json_type)
+
+
 
 
 
 # --- 1. MUNICIPAL CODE / ORDINANCE PARSER ---
 @app.post("/api/projects/{project_id}/sources/municipal-code")
 async def parse_municipal_code(project_id: str, data: dict):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     url = data.get("url", "")
     text = data.get("text", "")
@@ -3485,7 +4546,7 @@ async def parse_municipal_code(project_id: str, data: dict):
 
     source_name = name or (f"Municipal Code: {url[:50]}" if url else "Pasted Municipal Code")
     source = {
-        "id": str(uuid.uuid4())[:8],
+        "id": _short_id(),
         "source_type": "municipal_code",
         "name": source_name,
         "status": "processing",
@@ -3504,20 +4565,16 @@ async def parse_municipal_code(project_id: str, data: dict):
                 # Try common Municode API patterns
                 if "municode.com" in url.lower():
                     # Try the print/export version of Municode URLs
-                    import urllib.request
                     alt_urls = []
                     if "/codes/" in url:
                         alt_urls.append(url.replace("/codes/", "/print/"))
                     for alt in alt_urls:
                         try:
-                            req = urllib.request.Request(alt, headers={"User-Agent": "Mozilla/5.0"})
-                            with urllib.request.urlopen(req, timeout=15) as resp:
-                                html = resp.read().decode("utf-8", errors="replace")
-                            import re
-                            text_cleaned = re.sub(r'<script[^>]*>.*?</script>', '', html, flags=re.DOTALL)
-                            text_cleaned = re.sub(r'<style[^>]*>.*?</style>', '', text_cleaned, flags=re.DOTALL)
-                            text_cleaned = re.sub(r'<[^>]+>', ' ', text_cleaned)
-                            text_cleaned = re.sub(r'\s+', ' ', text_cleaned).strip()
+                            # Shared pooled client: repeat Municode fetches reuse a warm connection
+                            resp = await _get_preview_http().get(alt, timeout=15)
+                            resp.raise_for_status()
+                            html = resp.content.decode("utf-8", errors="replace")
+                            text_cleaned = _html_to_text(html)
                             if len(text_cleaned) > 200:
                                 raw_text = text_cleaned[:15000]
                                 break
@@ -3532,20 +4589,18 @@ async def parse_municipal_code(project_id: str, data: dict):
                         "(2) Download the PDF from the site and paste its text content, or "
                         "(3) Try a direct link to a specific chapter/section."
                     )
-                    sources = list(project.data_sources) if project.data_sources else []
-                    sources.append(source)
-                    store.update_project(project_id, data_sources=sources)
+                    store.append_data_source(project_id, source)
                     return source
 
         if not raw_text or len(raw_text.strip()) < 50:
             source["status"] = "error"
             source["error_message"] = "Not enough text content to analyze. Please paste the municipal code text directly."
-            sources = list(project.data_sources) if project.data_sources else []
-            sources.append(source)
-            store.update_project(project_id, data_sources=sources)
+            store.append_data_source(project_id, source)
             return source
 
-        source["raw_text"] = raw_text[:5000]
+        # One slice serves both the prompt and the stored excerpt
+        text_for_ai = raw_text[:10000]
+        source["raw_text"] = text_for_ai[:5000]
 
         ai_prompt = f"""Analyze this municipal code / ordinance text and extract ALL permit types, license types, and code enforcement processes mentioned.
 
@@ -3561,41 +4616,28 @@ Be thorough - extract every permit, license, and enforcement action you can find
 Respond in JSON format as a list of objects.
 
 Municipal Code Text:
-{raw_text[:10000]}
+{text_for_ai}
 
 Community context: {project.customer_name} - {project.community_url}"""
 
-        ai_result = _extract_with_ai(ai_prompt, "", "municipal_code_analysis")
+        ai_result = await _extract_with_ai_async(ai_prompt, "", "municipal_code_analysis", "list")
         if ai_result:
-            try:
-                import re
-                json_match = re.search(r'\[.*\]', ai_result, re.DOTALL)
-                if json_match:
-                    extracted = json.loads(json_match.group())
-                else:
-                    extracted = [{"raw_analysis": ai_result}]
-            except json.JSONDecodeError:
+            extracted = _extract_json_from_text(ai_result, "list")
+            if extracted is None:
                 extracted = [{"raw_analysis": ai_result}]
             source["extracted_data"] = {"requirements": extracted, "url": url, "text_length": len(raw_text)}
         else:
             # Fallback: keyword extraction
-            keywords = {
-                "permits": ["building permit", "grading permit", "demolition permit", "electrical permit",
-                            "plumbing permit", "mechanical permit", "sign permit", "encroachment permit",
-                            "excavation permit", "fire permit", "special event permit", "conditional use",
-                            "variance", "site plan", "subdivision", "zoning permit"],
-                "licenses": ["business license", "contractor license", "liquor license", "vendor permit",
-                             "home occupation", "peddler license", "taxi license", "alarm permit",
-                             "dog license", "solicitor permit", "rental license"],
-                "enforcement": ["code enforcement", "violation", "nuisance", "abatement", "citation",
-                                "property maintenance", "zoning violation", "abandoned vehicle",
-                                "overgrown vegetation", "illegal dumping"]
-            }
             found = []
             text_lower = raw_text.lower()
-            for category, terms in keywords.items():
+            if AHOCORASICK_AVAILABLE:
+                present = {term for _, term in _MUNICIPAL_CODE_KEYWORD_AC.iter(text_lower)}
+            else:
+                present = {term for terms in MUNICIPAL_CODE_KEYWORDS.values() for term in terms if term in text_lower}
+            # Report hits in keyword-list order, as the per-term scan did
+            for category, terms in MUNICIPAL_CODE_KEYWORDS.items():
                 for term in terms:
-                    if term in text_lower:
+                    if term in present:
                         found.append({
                             "type": category.rstrip("s"),
                             "name": term.title(),
@@ -3609,19 +4651,16 @@ Community context: {project.customer_name} - {project.community_url}"""
         source["status"] = "error"
         source["error_message"] = str(e)[:300]
 
-    sources = list(project.data_sources) if project.data_sources else []
-    sources.append(source)
-    store.update_project(project_id, data_sources=sources)
+    store.append_data_source(project_id, source)
     return source
 
 
 # --- 2. EXISTING FORM INGESTION ---
 @app.post("/api/projects/{project_id}/sources/existing-form")
 async def ingest_existing_form(project_id: str, data: dict):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     form_text = data.get("text", "")
     form_name = data.get("name", "Existing Form")
@@ -3634,7 +4673,7 @@ async def ingest_existing_form(project_id: str, data: dict):
         raise HTTPException(status_code=400, detail="Form text or URL is required")
 
     source = {
-        "id": str(uuid.uuid4())[:8],
+        "id": _short_id(),
         "source_type": "existing_form",
         "name": form_name,
         "status": "processing",
@@ -3643,6 +4682,7 @@ async def ingest_existing_form(project_id: str, data: dict):
     }
 
     try:
+        text_for_ai = form_text[:8000]
         ai_prompt = f"""Analyze this existing government application form and extract all form fields, their types, and whether they are required.
 
 For each field, provide:
@@ -3660,24 +4700,17 @@ Also identify:
 Respond in JSON format.
 
 Form Content:
-{form_text[:8000]}"""
+{text_for_ai}"""
 
-        ai_result = _extract_with_ai(ai_prompt, "", "form_field_extraction")
+        ai_result = await _extract_with_ai_async(ai_prompt, "", "form_field_extraction", "object")
         if ai_result:
-            try:
-                import re
-                json_match = re.search(r'\{.*\}', ai_result, re.DOTALL)
-                if json_match:
-                    extracted = json.loads(json_match.group())
-                else:
-                    extracted = {"raw_analysis": ai_result}
-            except json.JSONDecodeError:
+            extracted = _extract_json_from_text(ai_result, "object")
+            if extracted is None:
                 extracted = {"raw_analysis": ai_result}
             source["extracted_data"] = extracted
         else:
             # Fallback: basic field pattern detection
-            import re
-            field_patterns = re.findall(r'([A-Z][A-Za-z\s/]+)[:_]{1,}', form_text[:5000])
+            field_patterns = _FORM_FIELD_LABEL_RE.findall(text_for_ai[:5000])
             fields = []
             for f in field_patterns[:30]:
                 name = f.strip()
@@ -3699,19 +4732,16 @@ Form Content:
         source["status"] = "error"
         source["error_message"] = str(e)[:300]
 
-    sources = list(project.data_sources) if project.data_sources else []
-    sources.append(source)
-    store.update_project(project_id, data_sources=sources)
+    store.append_data_source(project_id, source)
     return source
 
 
 # --- 3. FEE SCHEDULE PARSER ---
 @app.post("/api/projects/{project_id}/sources/fee-schedule")
 async def parse_fee_schedule(project_id: str, data: dict):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     fee_text = data.get("text", "")
     fee_url = data.get("url", "")
@@ -3724,7 +4754,7 @@ async def parse_fee_schedule(project_id: str, data: dict):
         raise HTTPException(status_code=400, detail="Fee schedule text or URL is required")
 
     source = {
-        "id": str(uuid.uuid4())[:8],
+        "id": _short_id(),
         "source_type": "fee_schedule",
         "name": fee_name,
         "status": "processing",
@@ -3733,6 +4763,7 @@ async def parse_fee_schedule(project_id: str, data: dict):
     }
 
     try:
+        text_for_ai = fee_text[:8000]
         ai_prompt = f"""Analyze this government fee schedule and extract all fees.
 
 For each fee, provide:
@@ -3746,24 +4777,17 @@ For each fee, provide:
 Respond in JSON format as a list of fee objects.
 
 Fee Schedule:
-{fee_text[:8000]}"""
+{text_for_ai}"""
 
-        ai_result = _extract_with_ai(ai_prompt, "", "fee_schedule_extraction")
+        ai_result = await _extract_with_ai_async(ai_prompt, "", "fee_schedule_extraction", "list")
         if ai_result:
-            try:
-                import re
-                json_match = re.search(r'\[.*\]', ai_result, re.DOTALL)
-                if json_match:
-                    extracted = json.loads(json_match.group())
-                else:
-                    extracted = [{"raw_analysis": ai_result}]
-            except json.JSONDecodeError:
+            extracted = _extract_json_from_text(ai_result, "list")
+            if extracted is None:
                 extracted = [{"raw_analysis": ai_result}]
             source["extracted_data"] = {"fees": extracted}
         else:
             # Fallback: regex for dollar amounts
-            import re
-            fee_matches = re.findall(r'([A-Za-z][A-Za-z\s/()-]+?)\s*[\$:]?\s*\$\s*(\d+(?:,\d{3})*(?:\.\d{2})?)', fee_text[:5000])
+            fee_matches = _FEE_AMOUNT_RE.findall(text_for_ai[:5000])
             fees = []
             for name, amount in fee_matches[:30]:
                 name = name.strip()
@@ -3781,19 +4805,16 @@ Fee Schedule:
         source["status"] = "error"
         source["error_message"] = str(e)[:300]
 
-    sources = list(project.data_sources) if project.data_sources else []
-    sources.append(source)
-    store.update_project(project_id, data_sources=sources)
+    store.append_data_source(project_id, source)
     return source
 
 
 # --- 4. CROSS-SOURCE RECONCILIATION ---
 @app.post("/api/projects/{project_id}/sources/reconcile")
 async def reconcile_sources(project_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     if not project.configuration:
         raise HTTPException(status_code=400, detail="No configuration exists yet. Run analysis first.")
@@ -3830,7 +4851,10 @@ async def reconcile_sources(project_id: str):
             source_summaries.append(f"Fee Schedule '{s.get('name','')}': found {len(fees)} fees")
 
     # Build current config summary
-    config_rt_names = [rt.name.lower() for rt in config.record_types]
+    # Lowercased record type names and fee-name sets, built once for the rule-based checks below
+    config_rt_index = [(rt, rt.name.lower(), {f.name.lower() for f in rt.fees}) for rt in config.record_types]
+    config_rt_names = [rt_name for _, rt_name, _ in config_rt_index]
+    config_rt_name_set = set(config_rt_names)
     config_summary = {
         "record_types": [{"name": rt.name, "fields": len(rt.form_fields), "fees": len(rt.fees),
                           "steps": len(rt.workflow_steps), "docs": len(rt.required_documents)}
@@ -3841,25 +4865,27 @@ async def reconcile_sources(project_id: str):
 
     items = []
 
-    # AI reconciliation
-    ai_prompt = f"""You are an expert at configuring government PLC (Permitting, Licensing & Code Enforcement) systems.
+    # AI reconciliation: one prompt per non-empty source section, sent concurrently, so
+    # each request stays small and latency doesn't grow with the number of source types
+    config_summary_json = _json_dumps_indented(config_summary)
+    source_summary_text = chr(10).join(source_summaries)
+    sections = [
+        ("MUNICIPAL CODE REQUIREMENTS", all_municipal_reqs[:20]),
+        ("FORM FIELDS FROM EXISTING FORMS", all_form_fields[:30]),
+        ("FEE SCHEDULE DATA", all_fees[:20]),
+    ]
+    ai_prompts = [f"""You are an expert at configuring government PLC (Permitting, Licensing & Code Enforcement) systems.
 
-Compare these data sources against the current configuration and identify gaps, conflicts, and enrichment opportunities.
+Compare this data source against the current configuration and identify gaps, conflicts, and enrichment opportunities.
 
 CURRENT CONFIGURATION:
-{json.dumps(config_summary, indent=2)}
+{config_summary_json}
 
 DATA SOURCES COLLECTED:
-{chr(10).join(source_summaries)}
+{source_summary_text}
 
-MUNICIPAL CODE REQUIREMENTS:
-{json.dumps(all_municipal_reqs[:20], indent=2)}
-
-FORM FIELDS FROM EXISTING FORMS:
-{json.dumps(all_form_fields[:30], indent=2)}
-
-FEE SCHEDULE DATA:
-{json.dumps(all_fees[:20], indent=2)}
+{section_title}:
+{_json_dumps_indented(section_items)}
 
 For each finding, provide:
 - action: "add" (missing from config), "update" (exists but incomplete), or "flag" (potential conflict)
@@ -3870,40 +4896,39 @@ For each finding, provide:
 - description: detailed explanation
 - suggested_data: specific data to add/update (as JSON object)
 
-Respond as a JSON array of findings. Focus on the most impactful items first."""
+Respond as a JSON array of findings. Focus on the most impactful items first.""" for section_title, section_items in sections if section_items]
 
-    ai_result = _extract_with_ai(ai_prompt, "", "reconciliation_analysis")
-    if ai_result:
-        try:
-            import re
-            json_match = re.search(r'\[.*\]', ai_result, re.DOTALL)
-            if json_match:
-                ai_items = json.loads(json_match.group())
-                for item in ai_items[:25]:
-                    items.append({
-                        "id": str(uuid.uuid4())[:8],
-                        "action": item.get("action", "flag"),
-                        "target": item.get("target", "record_type"),
-                        "target_id": "",
-                        "record_type_name": item.get("record_type_name", ""),
-                        "confidence": item.get("confidence", 0.5),
-                        "source_ids": [s.get("id", "") for s in completed_sources],
-                        "title": item.get("title", "Finding"),
-                        "description": item.get("description", ""),
-                        "suggested_data": item.get("suggested_data"),
-                        "status": "pending"
-                    })
-        except (json.JSONDecodeError, Exception):
-            pass
+    ai_results = await asyncio.gather(*(_extract_with_ai_async(prompt, "", "reconciliation_analysis", "list") for prompt in ai_prompts))
+    ai_items = []
+    for ai_result in ai_results:
+        if not ai_result:
+            continue
+        parsed = _extract_json_from_text(ai_result, "list")
+        if isinstance(parsed, list):
+            ai_items.extend(item for item in parsed if isinstance(item, dict))
+    for item in ai_items[:25]:
+        items.append({
+            "id": _short_id(),
+            "action": item.get("action", "flag"),
+            "target": item.get("target", "record_type"),
+            "target_id": "",
+            "record_type_name": item.get("record_type_name", ""),
+            "confidence": item.get("confidence", 0.5),
+            "source_ids": [s.get("id", "") for s in completed_sources],
+            "title": item.get("title", "Finding"),
+            "description": item.get("description", ""),
+            "suggested_data": item.get("suggested_data"),
+            "status": "pending"
+        })
 
     # Fallback / supplemental: rule-based reconciliation
     # Check municipal code requirements against existing record types
     for req in all_municipal_reqs:
         if isinstance(req, dict) and req.get("name"):
             req_name_lower = req["name"].lower()
-            if not any(req_name_lower in rn or rn in req_name_lower for rn in config_rt_names):
+            if req_name_lower not in config_rt_name_set and not any(req_name_lower in rn or rn in req_name_lower for rn in config_rt_names):
                 items.append({
-                    "id": str(uuid.uuid4())[:8],
+                    "id": _short_id(),
                     "action": "add",
                     "target": "record_type",
                     "target_id": "",
@@ -3920,12 +4945,14 @@ Respond as a JSON array of findings. Focus on the most impactful items first."""
     for fee in all_fees:
         if isinstance(fee, dict) and fee.get("name"):
             applies_to = fee.get("applies_to", "").lower()
-            for rt in config.record_types:
-                if applies_to and (applies_to in rt.name.lower() or rt.name.lower() in applies_to):
-                    existing_fee_names = [f.name.lower() for f in rt.fees]
-                    if fee["name"].lower() not in existing_fee_names:
+            if not applies_to:
+                continue
+            fee_name_lower = fee["name"].lower()
+            for rt, rt_name, existing_fee_names in config_rt_index:
+                if applies_to in rt_name or rt_name in applies_to:
+                    if fee_name_lower not in existing_fee_names:
                         items.append({
-                            "id": str(uuid.uuid4())[:8],
+                            "id": _short_id(),
                             "action": "add",
                             "target": "fee",
                             "target_id": rt.id,
@@ -3938,40 +4965,36 @@ Respond as a JSON array of findings. Focus on the most impactful items first."""
                             "status": "pending"
                         })
 
-    # Deduplicate by title
-    seen_titles = set()
-    unique_items = []
+    # Deduplicate by title (first one wins), keeping at most 30
+    unique_by_title = {}
     for item in items:
-        item_title = item.get("title", "")
-        if item_title not in seen_titles:
-            seen_titles.add(item_title)
-            unique_items.append(item)
+        unique_by_title.setdefault(item.get("title", ""), item)
+        if len(unique_by_title) == 30:
+            break
+    unique_items = list(unique_by_title.values())
 
-    store.update_project(project_id, reconciliation_items=unique_items[:30])
-    return {"items": unique_items[:30], "source_count": len(completed_sources)}
+    store.update_project(project_id, reconciliation_items=unique_items)
+    return {"items": unique_items, "source_count": len(completed_sources)}
 
 
 # --- 5. PEER CITY TEMPLATES ---
 @app.get("/api/templates/peer-cities")
 async def list_peer_city_templates(search: str = ""):
-    results = []
-    for t in PEER_CITY_TEMPLATES:
-        if search:
-            search_lower = search.lower()
-            if (search_lower in t["name"].lower() or
-                search_lower in t["description"].lower() or
-                any(search_lower in tag for tag in t["tags"])):
-                results.append({k: v for k, v in t.items() if k != "record_types" and k != "departments" and k != "user_roles"})
-        else:
-            results.append({k: v for k, v in t.items() if k != "record_types" and k != "departments" and k != "user_roles"})
+    if not search:
+        return {"templates": _PEER_LIST_VIEW}
+    search_lower = search.lower()
+    results = [
+        view for view, (name, description, tags) in zip(_PEER_LIST_VIEW, _PEER_SEARCH_INDEX)
+        if search_lower in name or search_lower in description or any(search_lower in tag for tag in tags)
+    ]
     return {"templates": results}
 
 
 @app.get("/api/templates/peer-cities/{template_id}")
 async def get_peer_city_template(template_id: str):
-    for t in PEER_CITY_TEMPLATES:
-        if t["id"] == template_id:
-            return t
+    template = _PEER_BY_ID.get(template_id)
+    if template:
+        return template
     raise HTTPException(status_code=404, detail="Template not found")
 
 
@@ -3985,53 +5008,46 @@ async def apply_peer_template(project_id: str, data: dict):
     template_id = data.get("template_id", "")
     merge_mode = data.get("mode", "merge")  # "merge" or "replace"
 
-    template = None
-    for t in PEER_CITY_TEMPLATES:
-        if t["id"] == template_id:
-            template = t
-            break
+    template = _PEER_BY_ID.get(template_id)
 
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    # Build configuration from template
-    record_types = []
-    for rt_data in template.get("record_types", []):
-        rt = RecordType(
-            name=rt_data.get("name", "Unknown"),
-            category=rt_data.get("category", ""),
-            description=rt_data.get("description", ""),
-            form_fields=[FormField(
-                name=f.get("name", "field"), field_type=f.get("field_type", "text"),
-                required=f.get("required", True),
-                options=f.get("options"),
-            ) for f in rt_data.get("form_fields", [])],
-            fees=[Fee(
-                name=f.get("name", "fee"), amount=f.get("amount", 0),
-                fee_type=f.get("fee_type", "flat"),
-                when_applied="submission", formula=f.get("formula", ""),
-            ) for f in rt_data.get("fees", [])],
-            workflow_steps=[WorkflowStep(
-                name=s.get("name", "step"), order=s.get("order", 1),
-                assigned_role=s.get("assigned_role", ""),
-                status_to=(s.get("name", "step")).lower().replace(" ", "_"),
-            ) for s in rt_data.get("workflow_steps", [])],
-            required_documents=[RequiredDocument(
-                name=d.get("name", "document"), required=d.get("required", True),
-                stage=d.get("stage", "submission"),
-                description=d.get("description", ""),
-            ) for d in rt_data.get("required_documents", [])],
-        )
-        record_types.append(rt)
-
-    departments = [Department(
-        name=d.get("name", "Unknown"), description=d.get("description", "")
-    ) for d in template.get("departments", [])]
-
-    user_roles = [UserRole(
-        name=r.get("name", "Unknown"), description=r.get("description", ""),
-        permissions=r.get("permissions", []),
-    ) for r in template.get("user_roles", [])]
+    # Build configuration from template (one validate_python call per list)
+    record_types = _RECORD_TYPES_ADAPTER.validate_python([{
+        "name": rt_data.get("name", "Unknown"),
+        "category": rt_data.get("category", ""),
+        "description": rt_data.get("description", ""),
+        "form_fields": [{
+            "name": f.get("name", "field"), "field_type": f.get("field_type", "text"),
+            "required": f.get("required", True),
+            "options": f.get("options"),
+        } for f in rt_data.get("form_fields", [])],
+        "fees": [{
+            "name": f.get("name", "fee"), "amount": f.get("amount", 0),
+            "fee_type": f.get("fee_type", "flat"),
+            "when_applied": "submission", "formula": f.get("formula", ""),
+        } for f in rt_data.get("fees", [])],
+        "workflow_steps": [{
+            "name": s.get("name", "step"), "order": s.get("order", 1),
+            "assigned_role": s.get("assigned_role", ""),
+            "status_to": (s.get("name", "step")).lower().replace(" ", "_"),
+        } for s in rt_data.get("workflow_steps", [])],
+        "required_documents": [{
+            "name": d.get("name", "document"), "required": d.get("required", True),
+            "stage": d.get("stage", "submission"),
+            "description": d.get("description", ""),
+        } for d in rt_data.get("required_documents", [])],
+    } for rt_data in template.get("record_types", [])])
+
+    departments = _DEPARTMENTS_ADAPTER.validate_python([{
+        "name": d.get("name", "Unknown"), "description": d.get("description", "")
+    } for d in template.get("departments", [])])
+
+    user_roles = _USER_ROLES_ADAPTER.validate_python([{
+        "name": r.get("name", "Unknown"), "description": r.get("description", ""),
+        "permissions": r.get("permissions", []),
+    } for r in template.get("user_roles", [])])
 
     if merge_mode == "replace" or not project.configuration:
         config = Configuration(
@@ -4062,7 +5078,7 @@ async def apply_peer_template(project_id: str, data: dict):
 
     # Track as data source
     source = {
-        "id": str(uuid.uuid4())[:8],
+        "id": _short_id(),
         "source_type": "peer_template",
         "name": f"Template: {template['name']}",
         "status": "completed",
@@ -4072,9 +5088,7 @@ async def apply_peer_template(project_id: str, data: dict):
                            "departments_added": len(departments),
                            "roles_added": len(user_roles)},
     }
-    sources = list(project.data_sources) if project.data_sources else []
-    sources.append(source)
-    store.update_project(project_id, data_sources=sources)
+    store.append_data_source(project_id, source)
 
     return {"message": f"Template '{template['name']}' applied ({merge_mode})",
             "record_types": len(config.record_types),
@@ -4083,12 +5097,27 @@ async def apply_peer_template(project_id: str, data: dict):
 
 
 # --- 6. VALIDATION AGENT ---
+# Field-name variations that satisfy each essential field group (substring match)
+ESSENTIAL_FIELDS = {
+    "address": ["address", "property address", "location", "site address"],
+    "applicant": ["applicant", "owner", "owner name", "applicant name", "contact name"],
+}
+_ESSENTIAL_FIELD_RES = {
+    group: re.compile("|".join(map(re.escape, variations)))
+    for group, variations in ESSENTIAL_FIELDS.items()
+}
+# Words that mark a first workflow step as intake
+_INTAKE_KEYWORDS = ("submit", "receive", "intake", "filed", "application")
+_INTAKE_STEP_RE = re.compile("|".join(_INTAKE_KEYWORDS))
+# Record type categories that are not expected to carry fees
+_NO_FEE_CATEGORIES = frozenset({"code enforcement", "enforcement", "complaint"})
+
+
 @app.post("/api/projects/{project_id}/validate")
 async def validate_configuration(project_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     if not project.configuration:
         raise HTTPException(status_code=400, detail="No configuration to validate")
@@ -4100,28 +5129,30 @@ async def validate_configuration(project_id: str):
 
     # 1. Record type completeness
     for rt in config.record_types:
-        if not rt.form_fields:
+        form_fields, steps, fees = rt.form_fields, rt.workflow_steps, rt.fees
+        category_lc = (rt.category or "").lower()
+        if not form_fields:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "critical", "category": "completeness",
+                "id": _short_id(), "severity": "critical", "category": "completeness",
                 "title": f"{rt.name}: No form fields defined",
                 "description": f"Record type '{rt.name}' has no form fields. Applicants won't be able to submit any data.",
                 "record_type_id": rt.id,
                 "recommendation": "Add form fields that capture the information needed for this application type.",
                 "auto_fixable": False
             })
-        elif len(rt.form_fields) < 3:
+        elif len(form_fields) < 3:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "completeness",
-                "title": f"{rt.name}: Very few form fields ({len(rt.form_fields)})",
-                "description": f"Record type '{rt.name}' only has {len(rt.form_fields)} form fields. Most application types need at least 5-8 fields.",
+                "id": _short_id(), "severity": "warning", "category": "completeness",
+                "title": f"{rt.name}: Very few form fields ({len(form_fields)})",
+                "description": f"Record type '{rt.name}' only has {len(form_fields)} form fields. Most application types need at least 5-8 fields.",
                 "record_type_id": rt.id,
                 "recommendation": "Consider adding fields for applicant contact info, project details, and property information.",
                 "auto_fixable": False
             })
 
-        if not rt.workflow_steps:
+        if not steps:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "critical", "category": "workflow",
+                "id": _short_id(), "severity": "critical", "category": "workflow",
                 "title": f"{rt.name}: No workflow steps defined",
                 "description": f"Record type '{rt.name}' has no workflow. Applications will have no review or approval process.",
                 "record_type_id": rt.id,
@@ -4135,24 +5166,24 @@ async def validate_configuration(project_id: str):
             })
         else:
             # Check for unassigned workflow steps
-            unassigned = [s for s in rt.workflow_steps if not s.assigned_role]
-            if unassigned:
+            unassigned_names = [s.name for s in steps if not s.assigned_role]
+            if unassigned_names:
                 findings.append({
-                    "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "workflow",
-                    "title": f"{rt.name}: {len(unassigned)} workflow steps have no assigned role",
-                    "description": f"Steps without assigned roles: {', '.join([s.name for s in unassigned])}. These won't route to anyone.",
+                    "id": _short_id(), "severity": "warning", "category": "workflow",
+                    "title": f"{rt.name}: {len(unassigned_names)} workflow steps have no assigned role",
+                    "description": f"Steps without assigned roles: {', '.join(unassigned_names)}. These won't route to anyone.",
                     "record_type_id": rt.id,
                     "recommendation": "Assign a user role to each workflow step so applications get routed correctly.",
                     "auto_fixable": False
                 })
 
             # Check workflow has proper start and end
-            steps_sorted = sorted(rt.workflow_steps, key=lambda s: s.order)
+            steps_sorted = sorted(steps, key=_STEP_ORDER_KEY)
             first_step = steps_sorted[0].name.lower()
             last_step = steps_sorted[-1].name.lower()
-            if not any(w in first_step for w in ["submit", "receive", "intake", "filed", "application"]):
+            if not _INTAKE_STEP_RE.search(first_step):
                 findings.append({
-                    "id": str(uuid.uuid4())[:8], "severity": "info", "category": "best_practice",
+                    "id": _short_id(), "severity": "info", "category": "best_practice",
                     "title": f"{rt.name}: First workflow step may not be intake",
                     "description": f"First step is '{steps_sorted[0].name}'. Best practice is to start with an intake/submission step.",
                     "record_type_id": rt.id,
@@ -4161,9 +5192,9 @@ async def validate_configuration(project_id: str):
                 })
 
         # Fee validation
-        if not rt.fees and rt.category and rt.category.lower() not in ["code enforcement", "enforcement", "complaint"]:
+        if not fees and category_lc and category_lc not in _NO_FEE_CATEGORIES:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "fees",
+                "id": _short_id(), "severity": "warning", "category": "fees",
                 "title": f"{rt.name}: No fees configured",
                 "description": f"Record type '{rt.name}' has no fees. Most permit and license types require at least an application fee.",
                 "record_type_id": rt.id,
@@ -4172,21 +5203,21 @@ async def validate_configuration(project_id: str):
             })
 
         # Zero-amount fees
-        zero_fees = [f for f in rt.fees if f.amount == 0 and f.fee_type == "flat"]
-        if zero_fees:
+        zero_fee_names = [f.name for f in fees if f.amount == 0 and f.fee_type == "flat"]
+        if zero_fee_names:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "info", "category": "fees",
-                "title": f"{rt.name}: {len(zero_fees)} fees have $0.00 amount",
-                "description": f"Fees with zero amount: {', '.join([f.name for f in zero_fees])}",
+                "id": _short_id(), "severity": "info", "category": "fees",
+                "title": f"{rt.name}: {len(zero_fee_names)} fees have $0.00 amount",
+                "description": f"Fees with zero amount: {', '.join(zero_fee_names)}",
                 "record_type_id": rt.id,
                 "recommendation": "Verify these fees are intentionally $0.00 or update with correct amounts.",
                 "auto_fixable": False
             })
 
         # Document requirements
-        if not rt.required_documents and rt.category and rt.category.lower() in ["building", "planning"]:
+        if not rt.required_documents and category_lc in ("building", "planning"):
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "documents",
+                "id": _short_id(), "severity": "warning", "category": "documents",
                 "title": f"{rt.name}: No required documents",
                 "description": f"Building/planning record types typically require supporting documents (plans, reports, etc.).",
                 "record_type_id": rt.id,
@@ -4195,16 +5226,13 @@ async def validate_configuration(project_id: str):
             })
 
         # Required fields check - common fields every app should have
-        if rt.form_fields:
-            field_names_lower = [f.name.lower() for f in rt.form_fields]
-            essential_fields = {
-                "address": ["address", "property address", "location", "site address"],
-                "applicant": ["applicant", "owner", "owner name", "applicant name", "contact name"],
-            }
-            for field_group, variations in essential_fields.items():
-                if not any(any(v in fn for v in variations) for fn in field_names_lower):
+        if form_fields:
+            # Newline-joined so each group is one regex scan; no variation spans a newline
+            field_names_text = "\n".join(f.name.lower() for f in form_fields)
+            for field_group, pattern in _ESSENTIAL_FIELD_RES.items():
+                if not pattern.search(field_names_text):
                     findings.append({
-                        "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "completeness",
+                        "id": _short_id(), "severity": "warning", "category": "completeness",
                         "title": f"{rt.name}: Missing {field_group} field",
                         "description": f"No field for '{field_group}' was found. Most applications need this information.",
                         "record_type_id": rt.id,
@@ -4216,7 +5244,7 @@ async def validate_configuration(project_id: str):
     # 2. Department validation
     if not config.departments:
         findings.append({
-            "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "completeness",
+            "id": _short_id(), "severity": "warning", "category": "completeness",
             "title": "No departments configured",
             "description": "No departments have been set up. Departments help organize workflow routing and reporting.",
             "record_type_id": "",
@@ -4227,7 +5255,7 @@ async def validate_configuration(project_id: str):
     # 3. Role validation
     if not config.user_roles:
         findings.append({
-            "id": str(uuid.uuid4())[:8], "severity": "critical", "category": "completeness",
+            "id": _short_id(), "severity": "critical", "category": "completeness",
             "title": "No user roles configured",
             "description": "No user roles have been defined. Without roles, workflow steps cannot be assigned to staff.",
             "record_type_id": "",
@@ -4244,7 +5272,7 @@ async def validate_configuration(project_id: str):
         has_admin = any("admin" in r.name.lower() for r in config.user_roles)
         if not has_admin:
             findings.append({
-                "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "best_practice",
+                "id": _short_id(), "severity": "warning", "category": "best_practice",
                 "title": "No administrator role found",
                 "description": "No role with 'admin' or 'administrator' in the name was found.",
                 "record_type_id": "",
@@ -4258,7 +5286,7 @@ async def validate_configuration(project_id: str):
             for ws in rt.workflow_steps:
                 if ws.assigned_role and ws.assigned_role.lower() not in role_names_lower:
                     findings.append({
-                        "id": str(uuid.uuid4())[:8], "severity": "warning", "category": "workflow",
+                        "id": _short_id(), "severity": "warning", "category": "workflow",
                         "title": f"Workflow role '{ws.assigned_role}' not in user roles",
                         "description": f"Step '{ws.name}' in {rt.name} is assigned to '{ws.assigned_role}' but this role doesn't exist in the configured user roles.",
                         "record_type_id": rt.id,
@@ -4267,23 +5295,24 @@ async def validate_configuration(project_id: str):
                     })
 
     # 4. Overall health score
-    critical_count = sum(1 for f in findings if f.get("severity") == "critical")
-    warning_count = sum(1 for f in findings if f.get("severity") == "warning")
-    info_count = sum(1 for f in findings if f.get("severity") == "info")
+    severity_counts = Counter(f.get("severity") for f in findings)
+    critical_count = severity_counts["critical"]
+    warning_count = severity_counts["warning"]
+    info_count = severity_counts["info"]
 
     score = max(0, 100 - (critical_count * 15) - (warning_count * 5) - (info_count * 1))
 
     # Add success findings
     if config.record_types:
         findings.insert(0, {
-            "id": str(uuid.uuid4())[:8], "severity": "success", "category": "completeness",
+            "id": _short_id(), "severity": "success", "category": "completeness",
             "title": f"{len(config.record_types)} record types configured",
             "description": f"Your configuration includes {len(config.record_types)} record types covering your PLC processes.",
             "record_type_id": "", "recommendation": "", "auto_fixable": False
         })
     if config.departments:
         findings.insert(0, {
-            "id": str(uuid.uuid4())[:8], "severity": "success", "category": "completeness",
+            "id": _short_id(), "severity": "success", "category": "completeness",
             "title": f"{len(config.departments)} departments set up",
             "description": "Departments are configured for organizational structure.",
             "record_type_id": "", "recommendation": "", "auto_fixable": False
@@ -4307,16 +5336,14 @@ Configuration:
 Provide each recommendation as JSON with: severity ("info" or "warning"), category ("best_practice"), title, description, recommendation.
 Return as a JSON array."""
 
-        ai_result = _extract_with_ai(ai_prompt, "", "validation_recommendations")
+        ai_result = await _extract_with_ai_async(ai_prompt, "", "validation_recommendations", "list")
         if ai_result:
             try:
-                import re
-                json_match = re.search(r'\[.*\]', ai_result, re.DOTALL)
-                if json_match:
-                    ai_findings = json.loads(json_match.group())
+                ai_findings = _extract_json_from_text(ai_result, "list")
+                if ai_findings:
                     for af in ai_findings[:5]:
                         findings.append({
-                            "id": str(uuid.uuid4())[:8],
+                            "id": _short_id(),
                             "severity": af.get("severity", "info"),
                             "category": "best_practice",
                             "title": af.get("title", "AI Recommendation"),
@@ -4337,10 +5364,9 @@ Return as a JSON array."""
 # --- DATA SOURCES LIST ---
 @app.get("/api/projects/{project_id}/sources")
 async def list_data_sources(project_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
     return {
         "sources": project.data_sources or [],
         "reconciliation_items": project.reconciliation_items or [],
@@ -4350,38 +5376,38 @@ async def list_data_sources(project_id: str):
 
 @app.delete("/api/projects/{project_id}/sources/{source_id}")
 async def delete_data_source(project_id: str, source_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    # Filtering builds a new list, so the shared cached model is safe to read from
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
-    sources = [s for s in (project.data_sources or []) if (s.get("id") if isinstance(s, dict) else s.id) != source_id]
+    sources = [s for s in (project.data_sources or []) if s.get("id") != source_id]
     store.update_project(project_id, data_sources=sources)
     return {"message": "Source deleted"}
 
 
 @app.post("/api/projects/{project_id}/reconciliation/{item_id}/accept")
 async def accept_reconciliation(project_id: str, item_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     items = project.reconciliation_items or []
-    for item in items:
-        i = item if isinstance(item, dict) else item.dict()
+    config = project.configuration
+    config_changed = False
+    # reconciliation_items is List[Dict], so each item is a dict and is edited in place
+    for i in items:
         if i.get("id") == item_id:
             i["status"] = "accepted"
 
             # Apply the suggested data
-            if i.get("suggested_data") and project.configuration:
-                config = project.configuration if isinstance(project.configuration, Configuration) else Configuration(**project.configuration)
+            if i.get("suggested_data") and config:
                 if i["target"] == "record_type" and i["action"] == "add":
                     sd = i["suggested_data"]
                     new_rt = RecordType(name=sd.get("name", "New Record Type"),
                                         description=sd.get("description", ""),
                                         category=sd.get("category", ""))
                     config.record_types.append(new_rt)
-                    store.save_configuration(project_id, config)
+                    config_changed = True
                 elif i["target"] == "fee" and i.get("target_id"):
                     sd = i["suggested_data"]
                     for rt in config.record_types:
@@ -4389,43 +5415,43 @@ async def accept_reconciliation(project_id: str, item_id: str):
                             new_fee = Fee(name=sd.get("name", ""), amount=sd.get("amount", 0),
                                           fee_type=sd.get("fee_type", "flat"), when_applied="submission")
                             rt.fees.append(new_fee)
-                            store.save_configuration(project_id, config)
+                            config_changed = True
                             break
 
-    store.update_project(project_id, reconciliation_items=items)
+    # One store write (one KV/disk persist) for the status change and any config edits
+    updates = {"reconciliation_items": items}
+    if config_changed:
+        updates["configuration"] = config.model_dump()
+    store.update_project(project_id, **updates)
     return {"message": "Recommendation accepted and applied"}
 
 
 @app.post("/api/projects/{project_id}/reconciliation/{item_id}/reject")
 async def reject_reconciliation(project_id: str, item_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    # Copy the rejected item rather than mutating it: the cached model is shared
+    project = store.get_project_model(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
-    items = project.reconciliation_items or []
-    for item in items:
-        i = item if isinstance(item, dict) else item.dict()
-        if i.get("id") == item_id:
-            i["status"] = "rejected"
+    items = [{**item, "status": "rejected"} if item.get("id") == item_id else item
+             for item in (project.reconciliation_items or [])]
     store.update_project(project_id, reconciliation_items=items)
     return {"message": "Recommendation rejected"}
 
 
 @app.post("/api/projects/{project_id}/validate/auto-fix/{finding_id}")
 async def auto_fix_finding(project_id: str, finding_id: str):
-    project_data = store.get_project(project_id)
-    if not project_data:
+    project = store.get_project(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
-    project = Project(**project_data) if isinstance(project_data, dict) else project_data
 
     if not project.configuration:
         raise HTTPException(status_code=400, detail="No configuration")
 
-    config = project.configuration if isinstance(project.configuration, Configuration) else Configuration(**project.configuration)
+    config = project.configuration
     findings = project.validation_findings or []
+    config_changed = False
 
-    for f in findings:
-        fi = f if isinstance(f, dict) else f.dict()
+    for fi in findings:
         if fi.get("id") == finding_id and fi.get("auto_fixable") and fi.get("fix_data"):
             fd = fi["fix_data"]
 
@@ -4458,10 +5484,14 @@ async def auto_fix_finding(project_id: str, finding_id: str):
 
             fi["severity"] = "success"
             fi["title"] = f"[FIXED] {fi['title']}"
-            store.save_configuration(project_id, config)
+            config_changed = True
             break
 
-    store.update_project(project_id, validation_findings=findings)
+    # Findings and the fixed config go out in the same write
+    updates = {"validation_findings": findings}
+    if config_changed:
+        updates["configuration"] = config.model_dump()
+    store.update_project(project_id, **updates)
     return {"message": "Auto-fix applied"}
 
 
@@ -4518,7 +5548,7 @@ async def consultant_ask(project_id: str, data: dict):
                 if fees:
                     rt_info += f"\n  Fees: {', '.join(fees)}"
 
-                steps = sorted(rt.workflow_steps, key=lambda s: s.order)[:5] if rt.workflow_steps else []
+                steps = sorted(rt.workflow_steps, key=_STEP_ORDER_KEY)[:5] if rt.workflow_steps else []
                 if steps:
                     step_names = [s.name for s in steps]
                     rt_info += f"\n  Workflow: {' → '.join(step_names)}"
@@ -4657,7 +5687,7 @@ def _generate_fallback_answer(question: str, project, context: str) -> str:
                     fee_list = ", ".join([f"{f.name}: ${f.amount:.2f}" for f in rt.fees[:3]])
                     parts.append(f"  Fees: {fee_list}")
                 if rt.workflow_steps:
-                    steps = sorted(rt.workflow_steps, key=lambda s: s.order)
+                    steps = sorted(rt.workflow_steps, key=_STEP_ORDER_KEY)
                     step_names = [s.name for s in steps[:5]]
                     parts.append(f"  Workflow: {' → '.join(step_names)}")
                 parts.append("")
@@ -4677,7 +5707,7 @@ def _generate_fallback_answer(question: str, project, context: str) -> str:
             parts.append("**Workflow Processes:**\n")
             for rt in config.record_types[:5]:
                 if rt.workflow_steps:
-                    steps = sorted(rt.workflow_steps, key=lambda s: s.order)
+                    steps = sorted(rt.workflow_steps, key=_STEP_ORDER_KEY)
                     parts.append(f"**{rt.name}:**")
                     for s in steps:
                         assigned = f" (Assigned to: {s.assigned_role})" if s.assigned_role else ""
@@ -48,9 +48,11 @@ async def test_step1_parse_csv(async_client):
         assert parse_response.status_code == 200
         data = parse_response.json()
         assert data["status"] == "step_1_complete"
-        assert "csv_data" in data
         assert "activity" in data
+        # The summary is always inlined; csv_ref is added when it was also stored in KV
         assert len(data["csv_data"]) > 0
+        if "csv_ref" in data:
+            assert data["csv_ref"] == f"csv_data:{project_id}"
     finally:
         os.unlink(csv_path)
 
@@ -180,6 +182,85 @@ async def test_step4_empty_body(async_client):
     assert config_response.status_code in [200, 400]
 
 
+@pytest.mark.asyncio
+async def test_step4_requires_parsed_csv(async_client):
+    """Test Step 4: Uploaded files without a step 1 summary return 409."""
+    create_response = await async_client.post(
+        "/api/projects",
+        json={
+            "name": "Generate Before Parse Test",
+            "customer_name": "Test Customer"
+        }
+    )
+    assert create_response.status_code == 200
+    project_id = create_response.json()["id"]
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+        writer = csv_module.writer(f)
+        writer.writerow(['Permit Type', 'Fee Amount'])
+        writer.writerow(['Building Permit', '$250'])
+        csv_path = f.name
+
+    try:
+        with open(csv_path, 'rb') as f:
+            files = {'files': (os.path.basename(csv_path), f, 'text/csv')}
+            upload_response = await async_client.post(
+                f"/api/projects/{project_id}/upload",
+                files=files
+            )
+        assert upload_response.status_code == 200
+
+        # Skip step 1 and go straight to config generation
+        config_response = await async_client.post(
+            f"/api/projects/{project_id}/analyze/generate-config",
+            json={}
+        )
+        assert config_response.status_code == 409
+    finally:
+        os.unlink(csv_path)
+
+
+@pytest.mark.asyncio
+async def test_step4_after_step1_found_no_files(async_client, monkeypatch):
+    """Test Step 4: an empty step 1 summary (uploads not on this instance) still generates a config."""
+    import shutil
+    import index
+
+    monkeypatch.setattr(index.claude_service, "client", None)
+    create_response = await async_client.post(
+        "/api/projects",
+        json={"name": "Missing Uploads Test", "customer_name": "Test Customer"}
+    )
+    project_id = create_response.json()["id"]
+
+    upload_response = await async_client.post(
+        f"/api/projects/{project_id}/upload",
+        files={"files": ("permits.csv", b"Permit Type,Fee Amount\nBuilding Permit,$250\n", "text/csv")}
+    )
+    assert upload_response.status_code == 200
+    # Serverless: /tmp is per instance, so step 1 may run where the uploads don't exist
+    shutil.rmtree(os.path.join(index.UPLOAD_DIR, project_id))
+
+    parse_response = await async_client.post(f"/api/projects/{project_id}/analyze/parse-csv")
+    assert parse_response.status_code == 200
+    assert parse_response.json()["csv_data"] == ""
+
+    # Summary posted back by the client
+    config_response = await async_client.post(
+        f"/api/projects/{project_id}/analyze/generate-config",
+        json={"csv_data": parse_response.json()["csv_data"]}
+    )
+    assert config_response.status_code == 200
+
+    # Summary read from KV, where step 1 stored ""
+    monkeypatch.setattr(index, "_kv_mget", lambda keys: ["" if k.startswith("csv_data:") else None for k in keys])
+    config_response = await async_client.post(
+        f"/api/projects/{project_id}/analyze/generate-config",
+        json={}
+    )
+    assert config_response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_full_pipeline_data_flow(async_client):
     """Test running steps 1-4 sequentially, passing data forward."""
@@ -242,3 +323,81 @@ async def test_full_pipeline_data_flow(async_client):
 
     finally:
         os.unlink(csv_path)
+
+
+@pytest.mark.asyncio
+async def test_run_all_pipeline(async_client, monkeypatch):
+    """Test the run-all endpoint runs every step and returns one activity per step."""
+    from index import claude_service
+
+    # No client means mock mode: config generation uses MockGenerator instead of the API
+    monkeypatch.setattr(claude_service, "client", None)
+
+    create_response = await async_client.post(
+        "/api/projects",
+        json={
+            "name": "Run All Test",
+            "customer_name": "Test Customer"
+        }
+    )
+    assert create_response.status_code == 200
+    project_id = create_response.json()["id"]
+
+    # Run-all needs uploaded files
+    no_files_response = await async_client.post(
+        f"/api/projects/{project_id}/analyze/run-all"
+    )
+    assert no_files_response.status_code == 400
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as f:
+        writer = csv_module.writer(f)
+        writer.writerow(['Permit Type', 'Fee Amount'])
+        writer.writerow(['Building Permit', '$250'])
+        csv_path = f.name
+
+    try:
+        with open(csv_path, 'rb') as f:
+            files = {'files': (os.path.basename(csv_path), f, 'text/csv')}
+            upload_response = await async_client.post(
+                f"/api/projects/{project_id}/upload",
+                files=files
+            )
+        assert upload_response.status_code == 200
+
+        run_all_response = await async_client.post(
+            f"/api/projects/{project_id}/analyze/run-all"
+        )
+        assert run_all_response.status_code == 200
+        data = run_all_response.json()
+        assert data["status"] == "configured"
+        assert len(data["activities"]) == 4
+        assert "intelligence" in data
+    finally:
+        os.unlink(csv_path)
+
+
+@pytest.mark.asyncio
+async def test_run_all_uploads_missing_on_instance(async_client, monkeypatch):
+    """Test run-all configures the project when step 1 finds no uploads on this instance."""
+    import shutil
+    import index
+
+    monkeypatch.setattr(index.claude_service, "client", None)
+    create_response = await async_client.post(
+        "/api/projects",
+        json={"name": "Run All Missing Uploads", "customer_name": "Test Customer"}
+    )
+    project_id = create_response.json()["id"]
+
+    upload_response = await async_client.post(
+        f"/api/projects/{project_id}/upload",
+        files={"files": ("permits.csv", b"Permit Type,Fee Amount\nBuilding Permit,$250\n", "text/csv")}
+    )
+    assert upload_response.status_code == 200
+    shutil.rmtree(os.path.join(index.UPLOAD_DIR, project_id))
+
+    run_all_response = await async_client.post(f"/api/projects/{project_id}/analyze/run-all")
+    assert run_all_response.status_code == 200
+    data = run_all_response.json()
+    assert data["status"] == "configured"
+    assert len(data["activities"]) == 4
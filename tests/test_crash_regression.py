@@ -207,3 +207,125 @@ async def test_format_for_analysis_all_fields():
     assert "Planning Department" in result
     assert "Title 15" in result
     assert "Application form" in result
+
+
+@pytest.mark.asyncio
+async def test_sanitize_to_ascii_plain_ascii_passthrough():
+    """Test _sanitize_to_ascii returns pure-ASCII input unchanged."""
+    text = "Building Permit - $250 (non-refundable)"
+
+    result = _sanitize_to_ascii(text)
+
+    assert result == text
+
+
+@pytest.mark.asyncio
+async def test_csv_parse_file_high_cardinality(tmp_path):
+    """Test CSVParser.parse_file streams a large, high-cardinality CSV."""
+    from index import CSVParser, CSV_DISTINCT_CAP
+
+    path = tmp_path / "permits.csv"
+    rows = CSV_DISTINCT_CAP + 500
+    with open(path, "w", newline="") as f:
+        f.write("Permit Number,Status\n")
+        for i in range(rows):
+            f.write(f"P-{i},{'Open' if i % 2 else 'Closed'}\n")
+
+    metadata = CSVParser.parse_file(path)
+
+    assert metadata["total_rows"] == rows
+    assert metadata["columns"] == ["Permit Number", "Status"]
+    assert len(metadata["sample_rows"]) == 15
+    assert metadata["column_analysis"]["Status"]["unique_count"] == 2
+    assert metadata["column_analysis"]["Permit Number"]["unique_count"] == CSV_DISTINCT_CAP
+    assert metadata["column_analysis"]["Permit Number"]["total_count"] == rows
+
+
+@pytest.mark.asyncio
+async def test_csv_parse_file_block_boundaries(tmp_path, monkeypatch):
+    """Test CSVParser.parse_file decodes across block boundaries and drops invalid UTF-8."""
+    import index
+    from index import CSVParser
+
+    # A tiny block size splits multi-byte characters and quoted newlines across reads
+    monkeypatch.setattr(index, "CSV_READ_BLOCK_SIZE", 5)
+    path = tmp_path / "permits.csv"
+    path.write_bytes('Name,Notes\r\n"Café","line one\nline two"\r\nSign,€5'.encode("utf-8") + b"\xff\n")
+
+    metadata = CSVParser.parse_file(path)
+
+    assert metadata["columns"] == ["Name", "Notes"]
+    assert metadata["total_rows"] == 2
+    assert metadata["sample_rows"][0] == {"Name": "Café", "Notes": "line one\nline two"}
+    assert metadata["sample_rows"][1] == {"Name": "Sign", "Notes": "€5"}
+
+
+@pytest.mark.asyncio
+async def test_csv_parse_file_utf8_bom(tmp_path):
+    """Test a UTF-8 BOM does not leak into column names on either CSV path."""
+    pytest.importorskip("pyarrow")
+    from index import CSVParser
+
+    path = tmp_path / "permits.csv"
+    path.write_text("\ufeffPermit No,Type\n1001,Building\n1002,Electrical\n", encoding="utf-8")
+
+    for metadata in (CSVParser.parse_arrow(path), CSVParser.parse_file(path),
+                     CSVParser.parse_stream(CSVParser._iter_file_lines(path))):
+        assert metadata["columns"] == ["Permit No", "Type"]
+        assert metadata["total_rows"] == 2
+        assert metadata["sample_rows"][0] == {"Permit No": "1001", "Type": "Building"}
+        assert metadata["column_analysis"]["Permit No"]["total_count"] == 2
+
+@pytest.mark.asyncio
+async def test_extract_json_block_balanced():
+    """Test _extract_json_block stops at the matching bracket and ignores brackets in strings."""
+    from index import _extract_json_block
+
+    text = 'Findings: [{"title": "Fee ] table [draft]", "note": "say \\"hi\\""}, [1]]\nSee also [appendix].'
+    assert _extract_json_block(text, "[", "]") == '[{"title": "Fee ] table [draft]", "note": "say \\"hi\\""}, [1]]'
+    assert _extract_json_block('{"a": {"b": "}"}} trailing }', "{", "}") == '{"a": {"b": "}"}}'
+    # No block, or a block truncated mid-response
+    assert _extract_json_block("no json here", "[", "]") is None
+    assert _extract_json_block('[{"name": "Building Permit"', "[", "]") is None
+
+
+@pytest.mark.asyncio
+async def test_extract_json_from_text_embedded():
+    """Test _extract_json_from_text decodes JSON embedded in prose and stops at the value's end."""
+    from index import _extract_json_from_text
+
+    text = 'Here are the findings:\n[{"title": "Fee ] table", "severity": "info"}]\nSee also [appendix].'
+    assert _extract_json_from_text(text, "list") == [{"title": "Fee ] table", "severity": "info"}]
+    assert _extract_json_from_text('Result: {"a": {"b": 1}} done', "object") == {"a": {"b": 1}}
+    assert _extract_json_from_text("no json here", "list") is None
+    assert _extract_json_from_text('[{"name": "Building Permit"', "list") is None
+
+
+@pytest.mark.asyncio
+async def test_extract_with_ai_caches_only_complete_json(monkeypatch):
+    """Test _extract_with_ai caches finished answers with parseable JSON, and nothing else."""
+    from types import SimpleNamespace
+    import index
+
+    stored = {}
+    monkeypatch.setattr(index, "_kv_get", lambda key: None)
+    monkeypatch.setattr(index, "_kv_set", lambda key, value, ex=None: stored.__setitem__(key, value) or True)
+
+    def fake_client(text, stop_reason):
+        response = SimpleNamespace(
+            content=[SimpleNamespace(text=text)], stop_reason=stop_reason,
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+        )
+        return SimpleNamespace(messages=SimpleNamespace(create=lambda **kwargs: response))
+
+    monkeypatch.setattr(index.claude_service, "api_key", "test-key")
+    cases = [
+        ('[{"name": "Building Permit"', "max_tokens", False),
+        ("Sorry, I can't find any permits.", "end_turn", False),
+        ('Here you go: [{"name": "Building Permit"}]', "end_turn", True),
+    ]
+    for i, (text, stop_reason, cached) in enumerate(cases):
+        monkeypatch.setattr(index.claude_service, "client", fake_client(text, stop_reason))
+        stored.clear()
+        assert index._extract_with_ai(f"prompt {i}", "", "test", "list") == text
+        assert bool(stored) == cached